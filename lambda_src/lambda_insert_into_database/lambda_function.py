@@ -1,9 +1,11 @@
+import concurrent.futures
+import csv
+import io
 import json
 import logging
 import os
+import socket
 import urllib.parse
-import threading
-import queue
 
 import boto3
 import pymysql
@@ -13,6 +15,98 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 # logger.setLevel(logging.CRITICAL) # TODO: enable when production
 
+# Maps CSV header column names to field names
+COL_MAP = {
+    "Source Address": "src_addr",
+    "Unique ID": "unique_id",
+    "Timestamp": "timestamp",
+    "Heading": "heading",
+    "Ground Speed": "gnd_speed",
+    "Vertical Speed": "vert_speed",
+    "Speed Accuracy": "speed_acc",
+    "Latitude": "lat",
+    "Longitude": "lon",
+    "Horizontal Accuracy": "horz_acc",
+    # Distance above WGS-84 ellipsoid. Approximately the same as height above
+    # mean sea level (MSL)
+    "Geodetic Altitude": "geo_alt",
+    "Geodetic Vertical Accuracy": "geo_vert_acc",
+    "Barometric Altitude": "baro_alt",
+    "Barometric Altitude Accuracy": "baro_alt_acc",
+    # Height above ground level (AGL) or above takeoff location
+    "Height": "height",
+    "Height Type": "height_type",
+}
+
+# Inserted by the decoder in place of bytes that aren't valid UTF-8
+REPLACEMENT_CHAR = "\ufffd"
+
+# Number of rows to accumulate before sending a multi-row INSERT
+INSERT_BATCH_SIZE = 500
+
+REMOTE_ID_DATA_TABLE = "remoteid_packets"
+DRONE_LIST_TABLE = "drone_list"
+ACTIVE_TABLE = "active_flights"
+
+# Parameterized queries are sent with executemany(), which pymysql rewrites
+# into a single multi-row INSERT per batch. The no-op update skips duplicate
+# rows instead of failing the whole batch, without turning other errors into
+# warnings like INSERT IGNORE would.
+REMOTE_ID_DATA_INSERT_QUERY = (
+    f"INSERT INTO {REMOTE_ID_DATA_TABLE} ("
+    f"src_addr, unique_id, timestamp, "
+    f"heading, gnd_speed, vert_speed, "
+    f"lat, lon, pressALT, geoAlt, "
+    f"height, hAccuracy, vAccuracy, "
+    f"speedAccuracy) "
+    f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+    f"ON DUPLICATE KEY UPDATE src_addr=src_addr;"
+)
+ACTIVE_INSERT_QUERY = (
+    f"INSERT INTO {ACTIVE_TABLE} ("
+    f"src_addr, unique_id, lat, "
+    f"lon, alt, gnd_speed, "
+    f"vert_speed, heading, "
+    f"startTime, currTime) "
+    f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+    f"ON DUPLICATE KEY UPDATE "
+    f"currTime=VALUES(currTime), lat=VALUES(lat), "
+    f"lon=VALUES(lon), gnd_speed=VALUES(gnd_speed), "
+    f"vert_speed=VALUES(vert_speed), heading=VALUES(heading);"
+)
+
+# Queries run after all rows are inserted
+# fmt: off
+# Window functions require MySQL 8.0 or later
+DRONE_LIST_REFRESH_QUERY = (
+    f"INSERT INTO {DRONE_LIST_TABLE} (src_addr, unique_id, lastTime) "
+    f"SELECT latest.src_addr, latest.unique_id, latest.timestamp "
+    f"FROM ("
+    f"  SELECT src_addr, unique_id, timestamp, "
+    f"  ROW_NUMBER() OVER (PARTITION BY src_addr ORDER BY timestamp DESC) AS rn "  # noqa
+    f"  FROM {REMOTE_ID_DATA_TABLE}"
+    f") AS latest "
+    f"WHERE latest.rn = 1 "
+    f"ON DUPLICATE KEY UPDATE "
+    f"unique_id=VALUES(unique_id), lastTime=VALUES(lastTime);"
+)
+# Updates every active flight with its latest packet from the last 10 minutes
+ACTIVE_REFRESH_QUERY = (
+    f"INSERT INTO {ACTIVE_TABLE} (src_addr, unique_id, lat, lon, alt, gnd_speed, vert_speed, heading, startTime, currTime) "  # noqa
+    f"SELECT latest.src_addr, latest.unique_id, latest.lat, latest.lon, latest.height, latest.gnd_speed, latest.vert_speed, latest.heading, af.startTime, latest.timestamp "  # noqa
+    f"FROM ("
+    f"  SELECT src_addr, unique_id, lat, lon, height, gnd_speed, vert_speed, heading, timestamp, "  # noqa
+    f"  ROW_NUMBER() OVER (PARTITION BY src_addr ORDER BY timestamp DESC) AS rn "  # noqa
+    f"  FROM {REMOTE_ID_DATA_TABLE} "
+    f"  WHERE TIMESTAMPDIFF(second, timestamp, CURRENT_TIMESTAMP) < 600"
+    f") AS latest "
+    f"JOIN {ACTIVE_TABLE} AS af ON af.src_addr = latest.src_addr "
+    f"WHERE latest.rn = 1 "
+    f"ON DUPLICATE KEY UPDATE "
+    f"currTime=VALUES(currTime), lat=VALUES(lat), lon=VALUES(lon), gnd_speed=VALUES(gnd_speed), vert_speed=VALUES(vert_speed), heading=VALUES(heading);"  # noqa
+)
+# fmt: on
+
 
 def get_database_credentials():
     """Reads the Lambda environment variables to get the RDS database
@@ -57,9 +151,29 @@ def connect_to_database(user, pwd, host, db):
         return None
 
     logger.info("SUCCESS: Connection to RDS for MySQL instance succeeded.")
+    set_tcp_keepalive(connection)
     return connection
 
 
+def set_tcp_keepalive(connection, idle_time: int = 30) -> None:
+    """Enables TCP keepalive probes on the database connection's socket after
+    'idle_time' seconds of inactivity so the connection isn't silently
+    dropped between warm invocations."""
+
+    sock = getattr(connection, "_sock", None)
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # TCP_KEEPIDLE is only available on Linux
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle_time,
+            )
+    except OSError as e:
+        logger.warning(f"Could not enable TCP keepalive: {e}")
+
+
 def create_s3_client():
     """Attempts to create an S3 client. Returns the client object if
     successful. Returns None otherwise."""
@@ -83,15 +197,53 @@ if user_name is not None:
 else:
     conn = None
 s3_client = create_s3_client()
+# Worker thread for overlapping network requests within an invocation
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+def get_open_connection(connection):
+    """Returns the connection if it is open. Otherwise, attempts to reconnect
+    to the database. Returns the new connection object if successful. Returns
+    None if unsuccessful.
+    """
+
+    if connection is not None:
+        # Unlike connection.open, ping() detects connections that were closed
+        # by the server (e.g. RDS Proxy idle timeout) and reconnects in place
+        try:
+            connection.ping(reconnect=True)
+        except pymysql.MySQLError as e:
+            logger.warning(f"Database connection ping failed: {e}")
+        else:
+            set_tcp_keepalive(connection)
+            return connection
+    logger.warning(
+        "Database connection is not open. "
+        "Attempting to reconnect to database.",
+    )
+    connection = connect_to_database(
+        user_name, password, rds_proxy_host, db_name,
+    )
+    if connection is not None:
+        logger.info("SUCCESS: Reconnected to database successfully.")
+    return connection
 
 
-def execute_query(query: str, cursor) -> None:
-    """Executes a SQL query. Raises RuntimeError if database connection
-    closes."""
+def execute_query(query: str, cursor, batch: list | None = None) -> None:
+    """Executes a SQL query. If a batch of parameter tuples is given, the
+    query is executed for every tuple in the batch, which pymysql sends as a
+    single multi-row INSERT statement. Raises RuntimeError if database
+    connection closes."""
 
-    logger.info("Executing Query: %s" % query)
+    if batch is None:
+        logger.info("Executing Query: %s" % query)
+    else:
+        logger.info("Executing Query with %d rows: %s" % (len(batch), query))
     try:
-        cursor.execute(query)
+        if batch is None:
+            cursor.execute(query)
+        else:
+            cursor.executemany(query, batch)
     except pymysql.err.IntegrityError as e:
         logger.warning(f"Duplicate data: {e}")
     except pymysql.err.OperationalError as e:
@@ -111,24 +263,40 @@ def execute_query(query: str, cursor) -> None:
         logger.error(f"Unexpected MySQL Error: {e}")
 
 
-def execute_queries(query_queue, cursor, timeout=2):
-    """Function for executing SQL queries asynchronously. Times out after 2
-    seconds of no new data."""
-    global conn
+def rollback_transaction(connection) -> None:
+    """Rolls back the current transaction. Logs an error if unsuccessful,
+    e.g. if the connection was already closed."""
 
-    count = 0
     try:
-        while True:
-            query = query_queue.get(timeout=timeout)
-            try:
-                execute_query(query, cursor)
-            except RuntimeError:
-                break
-            if count % 10 == 0:
-                conn.commit()
-            count += 1
-    except queue.Empty:
-        pass
+        connection.rollback()
+    except pymysql.err.MySQLError as e:
+        logger.error(f"Failed to roll back transaction: {e}")
+
+
+def delete_s3_object(bucket: str, key: str) -> None:
+    """Deletes an object from an S3 bucket. Logs an error if unsuccessful."""
+
+    logger.info(f"Deleting file '{key}'")
+    try:
+        response = s3_client.delete_object(
+            Bucket=bucket,
+            Key=key,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error when removing file {key}: {e}")
+        logger.error(f"Ensure you have the s3:DeleteObject permission.")
+    else:
+        deleted = response.get("DeleteMarker")
+        if deleted is not None:
+            if deleted:
+                logger.info("Successfully deleted file.")
+            else:
+                logger.info(
+                    "Failed to delete file. Make sure the Lambda function has"
+                    "the s3:DeleteObject permission. If the bucket is"
+                    "versioned, you need the s3:DeleteObjectVersion"
+                    "permission.",
+                )
 
 
 def lambda_handler(event, context):
@@ -137,7 +305,9 @@ def lambda_handler(event, context):
     global conn  # this variable can get updated in the lambda_handler function
     global s3_client
 
-    logging.info(f"Received event: {json.dumps(event, indent=2)}")
+    # Avoid serializing the event unless it will actually be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received event: %s", json.dumps(event))
 
     if user_name is None:
         return {
@@ -171,16 +341,22 @@ def lambda_handler(event, context):
         }
     logger.info("SUCCESS: Parsed record in event successfully.")
 
+    # Reconnect to the database (if needed) while the S3 request is in flight
+    conn_future = executor.submit(get_open_connection, conn)
+
     logger.info("Attempting to get object from bucket.")
     try:
         response = s3_client.get_object(Bucket=bucket, Key=key)
     except s3_client.exceptions.NoSuchKey:
         logger.error(f"Object '{key}' does not exist in bucket '{bucket}'.")
+        # Keep the connection for the next invocation
+        conn = conn_future.result()
         return {
             "Status Code": 400,
             "Body": "Invalid event passed to lambda function.",
         }
     except s3_client.exceptions.InvalidObjectState:
+        conn = conn_future.result()
         return {
             "Status Code": 409,
             "Body": "Invalid Object State.",
@@ -190,114 +366,65 @@ def lambda_handler(event, context):
         f"CONTENT TYPE: {response['ContentType']}",
     )
 
-    if conn is None or not conn.open:
-        logger.warning(
-            "Database connection is not open. "
-            "Attempting to reconnect to database.",
-        )
-        conn = connect_to_database(
-            user_name, password, rds_proxy_host, db_name,
-        )
-        if conn is None:
-            logger.error("Couldn't reconnect to database.")
-            return {
-                "Status Code": 502,
-                "Body": "Couldn't establish connection to database.",
-            }
-        logger.info("SUCCESS: Reconnected to database successfully.")
+    conn = conn_future.result()
+    if conn is None:
+        logger.error("Couldn't reconnect to database.")
+        return {
+            "Status Code": 502,
+            "Body": "Couldn't establish connection to database.",
+        }
 
+    delete_future = None
+    insert_failed = False
     try:
-        file_body = response["Body"].read().decode("utf-8")
+        # Decode the object while streaming it instead of reading the whole
+        # file into memory. Undecodable bytes are replaced with U+FFFD, and
+        # rows containing it are skipped below.
+        file_body = io.TextIOWrapper(
+            response["Body"], encoding="utf-8", errors="replace", newline="",
+        )
     except Exception as e:
         logger.error(f"Error decoding file: {e}")
     else:
         with conn.cursor() as cur:
-            # Start a thread to execute SQL queries asynchronously
-            sql_query_queue = queue.Queue(maxsize=1000)
-            sql_thread = threading.Thread(
-                target=execute_queries,
-                args=(
-                    sql_query_queue,
-                    cur,
-                ),
-            )
-            sql_thread.start()
-
-            remote_id_data_table = "remoteid_packets"
-            drone_list_table = "drone_list"
-            active_table = "active_flights"
+            packets_batch = []
+            active_batch = []
 
             queried_packets = 0
             skipped_packets = 0
 
-            src_addr_idx = None
-            unique_id_idx = None
-            timestamp_idx = None
-            heading_idx = None
-            gnd_speed_idx = None
-            vert_speed_idx = None
-            speed_acc_idx = None
-            lat_idx = None
-            lon_idx = None
-            horz_acc_idx = None
-            geo_alt_idx = None
-            geo_vert_acc_idx = None
-            baro_alt_idx = None
-            baro_alt_acc_idx = None
-            height_idx = None
-            height_type_idx = None
-
-            rows = file_body.split("\n")
-            first_row = True
-            prev_src_addr = []
-            for row in rows:
-                data = row.replace("\r", "").split(",")
-                # Header column row
-                if first_row:
-                    for idx, col_name in enumerate(data):
-                        # This could probably be faster with a dictionary
-                        match col_name:
-                            case "Source Address":
-                                src_addr_idx = idx
-                            case "Unique ID":
-                                unique_id_idx = idx
-                            case "Timestamp":
-                                timestamp_idx = idx
-                            case "Heading":
-                                heading_idx = idx
-                            case "Ground Speed":
-                                gnd_speed_idx = idx
-                            case "Vertical Speed":
-                                vert_speed_idx = idx
-                            case "Speed Accuracy":
-                                speed_acc_idx = idx
-                            case "Latitude":
-                                lat_idx = idx
-                            case "Longitude":
-                                lon_idx = idx
-                            case "Horizontal Accuracy":
-                                horz_acc_idx = idx
-                            # Distance above WGS-84 ellipsoid. Approximately
-                            # the same as height above mean sea level (MSL)
-                            case "Geodetic Altitude":
-                                geo_alt_idx = idx
-                            case "Geodetic Vertical Accuracy":
-                                geo_vert_acc_idx = idx
-                            case "Barometric Altitude":
-                                baro_alt_idx = idx
-                            case "Barometric Altitude Accuracy":
-                                baro_alt_acc_idx = idx
-                            # Height above ground level (AGL) or above takeoff
-                            # location
-                            case "Height":
-                                height_idx = idx
-                            case "Height Type":
-                                height_type_idx = idx
-                            case _:
-                                logger.info(f"Unrecognized column: {col_name}")
-                    first_row = False
-                    continue
+            reader = csv.reader(file_body)
+            # Header column row
+            header = next(reader, [])
+            col_idx = {}
+            for idx, col_name in enumerate(header):
+                field = COL_MAP.get(col_name)
+                if field is None:
+                    logger.info(f"Unrecognized column: {col_name}")
+                else:
+                    col_idx[field] = idx
+            src_addr_idx = col_idx.get("src_addr")
+            unique_id_idx = col_idx.get("unique_id")
+            timestamp_idx = col_idx.get("timestamp")
+            heading_idx = col_idx.get("heading")
+            gnd_speed_idx = col_idx.get("gnd_speed")
+            vert_speed_idx = col_idx.get("vert_speed")
+            speed_acc_idx = col_idx.get("speed_acc")
+            lat_idx = col_idx.get("lat")
+            lon_idx = col_idx.get("lon")
+            horz_acc_idx = col_idx.get("horz_acc")
+            geo_alt_idx = col_idx.get("geo_alt")
+            geo_vert_acc_idx = col_idx.get("geo_vert_acc")
+            baro_alt_idx = col_idx.get("baro_alt")
+            height_idx = col_idx.get("height")
+            height_type_idx = col_idx.get("height_type")
+            # Check once per file instead of catching a TypeError every row
+            has_optional_cols = None not in (
+                baro_alt_idx, height_idx, height_type_idx,
+            )
 
+            prev_src_addr = set()
+            for data in reader:
                 if len(data) < 8:
                     logger.info(f"Skipping row with data: {data}")
                     skipped_packets += 1
@@ -307,6 +434,12 @@ def lambda_handler(event, context):
                     src_addr = data[src_addr_idx]
                     unique_id = data[unique_id_idx]
                     timestamp = data[timestamp_idx]  # TODO: validate timestamp
+                    # The numeric columns fail to parse if a byte couldn't be
+                    # decoded, but the string columns have to be checked
+                    if REPLACEMENT_CHAR in src_addr \
+                            or REPLACEMENT_CHAR in unique_id \
+                            or REPLACEMENT_CHAR in timestamp:
+                        raise ValueError("Undecodable bytes in row")
 
                     # Velocity
                     heading = int(data[heading_idx])
@@ -314,7 +447,7 @@ def lambda_handler(event, context):
                     vert_speed = float(data[vert_speed_idx])
                     speed_acc = data[speed_acc_idx]
                     if not speed_acc:
-                        speed_acc = "NULL"
+                        speed_acc = None
                     else:
                         speed_acc = int(speed_acc)
 
@@ -323,42 +456,36 @@ def lambda_handler(event, context):
                     lon = int(data[lon_idx]) / 1e7  # Implicit float cast
                     horz_acc = data[horz_acc_idx]
                     if not horz_acc:
-                        horz_acc = "NULL"
+                        horz_acc = None
                     else:
                         horz_acc = int(horz_acc)
 
                     # Altitude
                     geo_alt = data[geo_alt_idx]
                     if not geo_alt:
-                        geo_alt = "NULL"
+                        geo_alt = None
                     else:
                         geo_alt = float(geo_alt)
                     geo_vert_acc = data[geo_vert_acc_idx]
                     if not geo_vert_acc:
-                        geo_vert_acc = "NULL"
+                        geo_vert_acc = None
                     else:
                         geo_vert_acc = int(geo_vert_acc)
-                except ValueError as e:
-                    skipped_packets += 1
-                    continue
-                except IndexError as e:
-                    skipped_packets += 1
-                    logger.error(f"Probably issue with code: {e}")
-                    continue
 
-                try:
                     # These values are not required to be transmitted in
                     # ASTM F3411-22a. Empty string "" has a value of False.
-                    if not data[baro_alt_idx]:
-                        baro_alt = "NULL"
+                    if has_optional_cols:
+                        baro_alt = data[baro_alt_idx] or None
+                        if data[height_idx] and data[height_type_idx]:
+                            height = float(data[height_idx])
+                            height_type = data[height_type_idx]
+                        else:
+                            height = None
+                            height_type = None
                     else:
-                        baro_alt = data[baro_alt_idx]
-                    if data[height_idx] and data[height_type_idx]:
-                        height = float(data[height_idx])
-                        height_type = data[height_type_idx]
-                    else:
-                        height = "NULL"
-                        height_type = "NULL"
+                        baro_alt = None
+                        height = None
+                        height_type = None
                     # TODO: barometric altitude accuracy
                 except ValueError as e:
                     skipped_packets += 1
@@ -367,111 +494,84 @@ def lambda_handler(event, context):
                     skipped_packets += 1
                     logger.error(f"Probably issue with code: {e}")
                     continue
-                except TypeError:
-                    # If index is None, you get a TypeError
-                    baro_alt = "NULL"
-                    height = "NULL"
-                    height_type = "NULL"
-
-                # Only add to drone list if it's a source address we haven't
-                # seen in this upload yet
+
+                # Only add to active flights if it's a source address we
+                # haven't seen in this upload yet. The drone list is updated
+                # with the latest timestamp after all rows are inserted.
                 if src_addr not in prev_src_addr:
-                    sql_query = (
-                        f"INSERT INTO {drone_list_table} ("
-                        f"src_addr, unique_id, lastTime) "
-                        f"VALUES ('{src_addr:s}', '{unique_id:s}', "
-                        f"'{timestamp:s}'"
-                        f") ON DUPLICATE KEY UPDATE "
-                        f"lastTime = '{timestamp:s}';"  # this may not be true
-                    )
-                    try:
-                        sql_query_queue.put(sql_query, block=False)
-                    except queue.Full:
-                        skipped_packets += 1
-                        continue
-                    sql_query = (
-                        f"INSERT INTO {active_table} ("
-                        f"src_addr, unique_id, lat, "
-                        f"lon, alt, gnd_speed, "
-                        f"vert_speed, heading, "
-                        f"startTime, currTime) "
-                        f"VALUES ("
-                        f"{src_addr:s}', '{unique_id:s}',{lat:.6f}, "
-                        f"{lon:.6f},{height},{gnd_speed:.2f}, "
-                        f"{vert_speed:.2f}, {heading:d},{timestamp:s}"
-                        f"{timestamp:s});"
+                    active_batch.append((
+                        src_addr, unique_id, lat, lon, height, gnd_speed,
+                        vert_speed, heading, timestamp, timestamp,
+                    ))
+                    prev_src_addr.add(src_addr)
+
+                packets_batch.append((
+                    src_addr, unique_id, timestamp, heading, gnd_speed,
+                    vert_speed, lat, lon, baro_alt, geo_alt, height,
+                    horz_acc, geo_vert_acc, speed_acc,
+                ))
+                if len(packets_batch) < INSERT_BATCH_SIZE:
+                    continue
+                try:
+                    execute_query(ACTIVE_INSERT_QUERY, cur, active_batch)
+                    execute_query(
+                        REMOTE_ID_DATA_INSERT_QUERY, cur, packets_batch,
                     )
-                    try:
-                        sql_query_queue.put(sql_query, block=False)
-                    except queue.Full:
-                        logger.error("Failed to add Active Flights Query")
-                        skipped_packets += 1
-                        continue
-                    prev_src_addr.append(src_addr)
-
-                sql_query = (
-                    f"INSERT INTO {remote_id_data_table} ("
-                    f"src_addr, unique_id, timestamp, "
-                    f"heading, gnd_speed, vert_speed, "
-                    f"lat, lon, pressALT, geoAlt, "
-                    f"height, hAccuracy, vAccuracy, "
-                    f"speedAccuracy) "
-                    f"VALUES ("
-                    f"'{src_addr:s}', '{unique_id:s}', '{timestamp:s}', "  # can't use backticks for a string lol  # noqa
-                    f"{heading:d}, {gnd_speed:.2f}, {vert_speed:.2f}, "
-                    f"{lat:.6f}, {lon:.6f}, {baro_alt}, {geo_alt}, "
-                    f"{height}, {horz_acc}, {geo_vert_acc}, "
-                    f"{speed_acc});"
-                )
+                except RuntimeError:
+                    insert_failed = True
+                    break
+                queried_packets += len(packets_batch)
+                packets_batch.clear()
+                active_batch.clear()
+            else:
+                # Send the remaining rows at the end of the file
                 try:
-                    sql_query_queue.put(sql_query, block=False)
-                except queue.Full:
-                    skipped_packets += 1
+                    if active_batch:
+                        execute_query(ACTIVE_INSERT_QUERY, cur, active_batch)
+                    if packets_batch:
+                        execute_query(
+                            REMOTE_ID_DATA_INSERT_QUERY, cur, packets_batch,
+                        )
+                except RuntimeError:
+                    insert_failed = True
                 else:
-                    queried_packets += 1
-
-            sql_thread.join()
-            conn.commit()
-
-            # TODO: execute SQL statement to get the latest time stamp
-            # Also adds new drones to drone list
-            # fmt: off
-            sql_query = (
-                f"INSERT INTO {drone_list_table} (src_addr, unique_id, lastTime) "  # noqa
-                f"SELECT s.src_addr, s.unique_id, s.timestamp "
-                f"FROM {remote_id_data_table} s "
-                f"INNER JOIN ("
-                f"  SELECT src_addr, MAX(timestamp) AS latest_timestamp "
-                f"  FROM {remote_id_data_table}"
-                f"  GROUP BY src_addr "
-                f") AS grouped ON s.src_addr = grouped.src_addr AND s.timestamp = grouped.latest_timestamp "  # noqa
-                f"ON DUPLICATE KEY UPDATE "
-                f"unique_id=VALUES(unique_id), lastTime=VALUES(lastTime);"
-            )
-            # fmt: on
-            try:
-                execute_query(sql_query, cur)
-            except RuntimeError:
-                logger.error("Failed to update current drone list table.")
+                    queried_packets += len(packets_batch)
+                    # Commit all batches in a single transaction
+                    conn.commit()
+
+            if insert_failed:
+                # None of the batches from this file are committed yet, so
+                # roll all of them back instead of leaving them pending on
+                # the cached connection
+                logger.error("Failed to insert packets. Rolling back file.")
+                rollback_transaction(conn)
+                skipped_packets += queried_packets + len(packets_batch)
+                queried_packets = 0
             else:
-                conn.commit()
-
-            sql_query = (
-                f"INSERT INTO {active_table} (src_addr, unique_id, lat,lon, alt, gnd_speed, vert_speed, heading, startTime, currTime)"
-                f"SELECT s.src_addr, s.unique_id, s.lat,s.lon,s.height,s.gnd_speed,s.vert_speed,s.heading,active_flights.startTime,MAX(s.timestamp) "
-                f"FROM {remote_id_data_table} s, {active_table}"
-                f"WHERE {active_table}.src_addr = s.src_addr and TIMESTAMPDIFF(second,s.timestamp,CURRENT_TIMESTAMP)<600"
-                f"GROUP BY s.src_addr"
-                f"ON DUPLICATE KEY UPDATE "
-                f"currTime=VALUES(currTime), lat=VALUES(lat),lon=VALUES(lon),gnd_speed=VALUES(gnd_speed),vert_speed=VALUES(vert_speed),heading=VALUES(heading);"
-            )
-            # fmt: on
-            try:
-                execute_query(sql_query, cur)
-            except RuntimeError:
-                logger.error("Failed to update current drone list table.")
-            else:
-                conn.commit()
+                # The file has been fully read, so delete it from the bucket
+                # while the tables are updated
+                delete_future = executor.submit(delete_s3_object, bucket, key)
+
+                # TODO: execute SQL statement to get the latest time stamp
+                # Also adds new drones to drone list
+                # Each table update is committed or rolled back on its own, so
+                # no row locks stay held on the cached connection between
+                # invocations
+                try:
+                    execute_query(DRONE_LIST_REFRESH_QUERY, cur)
+                except RuntimeError:
+                    logger.error("Failed to update current drone list table.")
+                    rollback_transaction(conn)
+                else:
+                    conn.commit()
+
+                try:
+                    execute_query(ACTIVE_REFRESH_QUERY, cur)
+                except RuntimeError:
+                    logger.error("Failed to update active flights table.")
+                    rollback_transaction(conn)
+                else:
+                    conn.commit()
 
             # TODO: send HTTP POST TO Trackserver plugin
 
@@ -480,28 +580,18 @@ def lambda_handler(event, context):
         f"Skipped {skipped_packets:d}.",
     )
 
-    # Delete object from bucket
-    logger.info(f"Deleting file '{key}'")
-    try:
-        response = s3_client.delete_object(
-            Bucket=bucket,
-            Key=key,
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error when removing file {key}: {e}")
-        logger.error(f"Ensure you have the s3:DeleteObject permission.")
+    if insert_failed:
+        # Keep the file in the bucket since none of its rows were stored
+        return {
+            "Status Code": 502,
+            "Body": "Failed to insert packets into database.",
+        }
+
+    # Wait for the uploaded file to be deleted before the invocation ends
+    if delete_future is None:
+        delete_s3_object(bucket, key)
     else:
-        deleted = response.get("DeleteMarker")
-        if deleted is not None:
-            if deleted:
-                logger.info("Successfully deleted file.")
-            else:
-                logger.info(
-                    "Failed to delete file. Make sure the Lambda function has"
-                    "the s3:DeleteObject permission. If the bucket is"
-                    "versioned, you need the s3:DeleteObjectVersion"
-                    "permission.",
-                )
+        delete_future.result()
 
     # TODO: insert into active flights
 
@@ -78,7 +78,9 @@ def lambda_handler(event, context):
     """
     global conn  # this variable can get updated in the lambda_handler function
 
-    logging.info("Received event: " + json.dumps(event, indent=2))
+    # Avoid serializing the event unless it will actually be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received event: %s", json.dumps(event))
 
     if user_name is None:
         return 502
@@ -145,12 +147,11 @@ def lambda_handler(event, context):
 
         conn.commit()
 
-        # Log items that were added
-        cur.execute(f"SELECT * FROM {complete_table_name:s}")
-        logger.info("The following items are in the database:")
-        for row in cur:
-            item_count += 1
-            logger.info(row)
+        # Count the items in the table on the server instead of fetching and
+        # logging every row
+        cur.execute(f"SELECT COUNT(*) FROM {complete_table_name:s}")
+        item_count = cur.fetchone()[0]
+        logger.info(f"There are {item_count:d} items in the database.")
     conn.commit()
 
     return {
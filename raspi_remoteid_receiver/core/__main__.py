@@ -3,13 +3,21 @@ import logging.handlers
 import multiprocessing
 import os
 import queue
+import shutil
 import signal
 import subprocess
 import sys
 import threading
+from pathlib import Path
 
 # Local files
-from raspi_remoteid_receiver.core import setup_logging, aws_communicator, channel_swapper, csv_creator, packet_logger
+from raspi_remoteid_receiver.core import setup_logging, aws_communicator, channel_swapper, csv_creator, helpers, packet_logger
+
+# Stores the tshark path and modification time from the last successful
+# requirements check
+REQUIREMENTS_CACHE_FILE = Path(
+    Path.home(), ".cache", "raspi_remoteid_receiver", "requirements_ok",
+)
 
 
 def all_requirements_installed() -> bool:
@@ -19,12 +27,9 @@ def all_requirements_installed() -> bool:
     cli_utilities = ["iw", "airmon-ng", "tshark"]
     for utility in cli_utilities:
         logger.info(f"Checking '{utility}' installation.")
-        cmd = f"command -v {utility}"
-        try:
-            output = subprocess.check_output(
-                cmd, shell=True, text=True,
-            ).strip()
-        except subprocess.CalledProcessError:
+        # Search PATH in-process instead of spawning a shell
+        path = shutil.which(utility)
+        if path is None:
             error_msg = f"Could not find '{utility}' command-line utility."
             match utility:
                 case "iw":
@@ -41,25 +46,33 @@ def all_requirements_installed() -> bool:
                     help_msg = ""
             logger.error(f"{error_msg} {help_msg}")
             return False
-        logger.info(f"Found '{utility}' at '{output}'")
+        logger.info(f"Found '{utility}' at '{path}'")
 
     # TODO: add lua script from repo if not installed
     # Check if Open Drone ID Wireshark dissector is installed
     logger.info("Checking Open Drone ID dissector installation.")
-    # List all protocols, find lines with 'opendroneid' case-insensitive
-    # Split fields by tab character (according to tshark manual page)
-    # Get the third field which should be the display filter name
-    # Note: tab character is inserted in by Python, so $'\t' is not needed
-    cmd = "tshark -G protocols | grep -i opendroneid | cut -d '\t' -f 3"
+    # List all protocols
+    cmd = ["tshark", "-G", "protocols"]
     try:
-        output = subprocess.check_output(
-            cmd, stderr=subprocess.STDOUT,
-            shell=True, text=True,
-        )
+        output = subprocess.run(
+            cmd, capture_output=True, text=True, check=True,
+            env=helpers.SUBPROCESS_ENV,
+        ).stdout
     except subprocess.CalledProcessError as e:
-        logger.error(f"Error running command {cmd}.")
+        logger.error(f"Error running command {' '.join(cmd)}.")
         logger.error(f"STDOUT: {e.stdout}")
+        logger.error(f"STDERR: {e.stderr}")
         return False
+    # Find lines with 'opendroneid' case-insensitive
+    # Split fields by tab character (according to tshark manual page)
+    # Get the third field which should be the display filter name
+    found_protocols = set()
+    for line in output.splitlines():
+        if "opendroneid" not in line.lower():
+            continue
+        fields = line.split("\t")
+        if len(fields) >= 3:
+            found_protocols.add(fields[2])
 
     critical_protocols = [
         "opendroneid",
@@ -68,7 +81,7 @@ def all_requirements_installed() -> bool:
         "opendroneid.message.pack",
     ]
     for protocol in critical_protocols:
-        if protocol not in output:
+        if protocol not in found_protocols:
             logger.error(f"Missing Open Drone ID protocol: {protocol}")
             return False
         logger.info(f"Found Open Drone ID protocol: {protocol}")
@@ -80,7 +93,7 @@ def all_requirements_installed() -> bool:
         "opendroneid.message.selfid",
     ]
     for protocol in non_critical_protocols:
-        if protocol not in output:
+        if protocol not in found_protocols:
             logger.warning(f"Missing optional protocol: {protocol}")
         else:
             logger.info(f"Found optional protocol: {protocol}")
@@ -88,6 +101,49 @@ def all_requirements_installed() -> bool:
     return True
 
 
+def get_requirements_cache_key() -> str | None:
+    """Returns a key which changes whenever tshark is reinstalled or
+    upgraded. Returns None if tshark can't be found."""
+    tshark_path = shutil.which("tshark")
+    if tshark_path is None:
+        return None
+    try:
+        mtime_ns = os.stat(tshark_path).st_mtime_ns
+    except OSError:
+        return None
+    return f"{tshark_path} {mtime_ns}"
+
+
+def requirements_satisfied() -> bool:
+    """Returns True if all required utilities are installed. Skips the check
+    if it already passed on a previous run with the same tshark binary since
+    running 'tshark -G protocols' initializes every dissector."""
+    cache_key = get_requirements_cache_key()
+    if cache_key is not None:
+        try:
+            cached_key = REQUIREMENTS_CACHE_FILE.read_text()
+        except OSError:
+            cached_key = None
+        if cached_key == cache_key:
+            logger.info(
+                f"Requirements already checked. Delete "
+                f"{REQUIREMENTS_CACHE_FILE} to check again.",
+            )
+            return True
+
+    if not all_requirements_installed():
+        return False
+
+    # Only successful checks are cached
+    if cache_key is not None:
+        try:
+            REQUIREMENTS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            REQUIREMENTS_CACHE_FILE.write_text(cache_key)
+        except OSError as e:
+            logger.warning(f"Could not cache requirements check: {e}")
+    return True
+
+
 def main() -> int:
     """Main script for setting up threads."""
 
@@ -96,7 +152,7 @@ def main() -> int:
         logger.warning("This script may need to be run with root permissions.")
 
     # Check tshark and OpenDroneID installation
-    if not args.no_check_requirements and not all_requirements_installed():
+    if not args.no_check_requirements and not requirements_satisfied():
         logger.critical("Missing requirements. Exiting...")
         return 1
 
@@ -114,7 +170,7 @@ def main() -> int:
     # Event to signal low power mode
     sleep_event = multiprocessing.Event()
     # KeyboardInterrupt event (SIGINT)
-    keyboard_interrupt_event = threading.Event()
+    keyboard_interrupt_event = multiprocessing.Event()
 
     # Queues to send interface names from setup thread to packet logger thread
     wifi_interface_queue = multiprocessing.Queue(maxsize=1)
@@ -161,24 +217,26 @@ def main() -> int:
         sleep_event=sleep_event,
         sleep_timeout=sleep_timeout,
         interface_timeout=interface_setup_timeout,
+        cpu_affinity=args.pin_cores,
     )
     logger.info("Starting packet logger process")
     packet_logger_process.start()
 
     # Queue for indicating which files need to be uploaded to the cloud
-    upload_file_queue = queue.Queue(maxsize=10)
+    upload_file_queue = multiprocessing.Queue(maxsize=10)
 
-    # Event for indicating when the csv writer thread has terminated
-    csv_writer_exit_event = threading.Event()
+    # Event for indicating when the csv writer process has terminated
+    csv_writer_exit_event = multiprocessing.Event()
     csv_writer_exit_event.clear()
 
-    csv_writer_thread = csv_creator.CSVCreatorThread(
+    csv_writer_process = csv_creator.CSVCreatorProcess(
         packet_queue=packet_queue,
         log_queue=log_queue,
         upload_file_queue=upload_file_queue,
         exit_event=csv_writer_exit_event,
         sleep_event=sleep_event,
         sigint_event=keyboard_interrupt_event,
+        logging_level=root_logging_level,
     )
 
     upload_bucket_name = args.bucket_name
@@ -195,8 +253,8 @@ def main() -> int:
         ),
     )
 
-    logger.info("Starting csv writer thread...")
-    csv_writer_thread.start()
+    logger.info("Starting csv writer process...")
+    csv_writer_process.start()
     if args.upload_to_aws:
         logger.info("Starting uploader thread...")
         uploader_thread.start()
@@ -213,44 +271,24 @@ def main() -> int:
             if not first_sigint:
                 # Kill all processes with no cleanup
                 packet_logger_process.kill()
+                csv_writer_process.kill()
                 os._exit(1)
             # Send SIGINT signal is automatically sent to all processes
             print(
                 "\nCaught SIGINT, closing threads...",
                 file=sys.stderr, flush=True,
             )
+            # Every thread and the csv writer process check this event
+            # regularly and exit on their own. The packet logger process
+            # receives the SIGINT itself.
             keyboard_interrupt_event.set()
-            # Unblock channel swapper thread
-            try:
-                wifi_interface_queue.put_nowait(None)
-            except queue.Full:
-                pass
-            try:
-                bluetooth_interface_queue.put_nowait(None)
-            except queue.Full:
-                pass
-            # Unblock packet logger thread
-            try:
-                packet_queue.put_nowait(None)
-            except queue.Full:
-                pass
-            # Unblock csv writer thread
-            try:
-                packet_queue.put_nowait(None)
-            except queue.Full:
-                pass
-            # Unblock uploader thread
-            try:
-                upload_file_queue.put_nowait(None)
-            except queue.Full:
-                pass
             first_sigint = False
 
     signal.signal(signal.SIGINT, sigint_handler)
 
     channel_swapper_thread.join()
     packet_logger_process.join()
-    csv_writer_thread.join()
+    csv_writer_process.join()
 
     if args.upload_to_aws:
         uploader_thread.join()
@@ -261,8 +299,14 @@ def main() -> int:
 
 if __name__ == "__main__":
     # if this is "fork", then all processes need to be started before any
-    # threads are started
-    multiprocessing.set_start_method("spawn")
+    # threads are started. "forkserver" forks children from a clean
+    # single-threaded server process, so the processes can safely be started
+    # after the threads. Each child still re-imports this module and the
+    # core modules, the same as with "spawn".
+    if sys.platform == "linux":
+        multiprocessing.set_start_method("forkserver")
+    else:
+        multiprocessing.set_start_method("spawn")
 
     # Create command line arguments
     parser = argparse.ArgumentParser(
@@ -287,6 +331,10 @@ if __name__ == "__main__":
     parser.add_argument(
         "--no-check-requirements", action="store_true",
     )
+    parser.add_argument(
+        "--pin-cores", type=int, nargs="+", metavar="CORE",
+        help="Pin the packet logger process to the given CPU cores",
+    )
     parser.add_argument(
         "--tshark-capture",
         type=int,
@@ -1,16 +1,42 @@
+import concurrent.futures
 import logging
+import multiprocessing
 import os
 import pathlib
-import threading
 import queue
 
 # AWS modules
 import boto3
+import boto3.exceptions
+import botocore.config
 import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
 
 # Local modules
 from raspi_remoteid_receiver.core import helpers, setup_logging
 
+MB = 1024 * 1024
+
+# Seconds between checks of the exit events while waiting on the file queue
+QUEUE_POLL_INTERVAL = 0.25
+
+# Number of files that can be uploaded at the same time
+UPLOAD_MAX_WORKERS = 4
+
+# Shared by every upload so that large files are split into parts which are
+# uploaded in parallel
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * MB,
+    multipart_chunksize=8 * MB,
+    max_concurrency=8,
+)
+
+# Enough pooled connections for every part of every concurrent upload
+CLIENT_CONFIG = botocore.config.Config(
+    max_pool_connections=UPLOAD_MAX_WORKERS * TRANSFER_CONFIG.max_concurrency,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+)
+
 
 def create_s3_client() -> boto3.client:
     r"""Creates a boto3 client to communicate with Amazon Simple Storage
@@ -36,7 +62,7 @@ def create_s3_client() -> boto3.client:
 
     :return: S3 client object
     """
-    return boto3.client("s3")
+    return boto3.client("s3", config=CLIENT_CONFIG)
 
 
 def upload_file(
@@ -73,8 +99,16 @@ def upload_file(
         f"{bucket}",
     )
     try:
-        s3_client.upload_file(file_name, bucket, object_name)
-    except botocore.exceptions.ClientError as e:
+        s3_client.upload_file(
+            file_name, bucket, object_name, Config=TRANSFER_CONFIG,
+        )
+    # S3Transfer wraps client errors in S3UploadFailedError, while connection
+    # problems are raised as BotoCoreError
+    except (
+            boto3.exceptions.S3UploadFailedError,
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+    ) as e:
         logger.error("Failed to upload file to bucket.")
         logger.error(e)
         return False
@@ -82,10 +116,47 @@ def upload_file(
     return True
 
 
+def upload_and_remove(
+        s3_client: boto3.client, file_name: pathlib.Path, bucket: str,
+        logger: logging.Logger,
+) -> bool | None:
+    """Uploads the file to the S3 bucket and then removes the local copy.
+    Returns True if the file was uploaded, False if the upload failed and
+    None if the file doesn't exist."""
+    try:
+        uploaded = upload_file(s3_client, file_name, bucket, logger=logger)
+    except FileNotFoundError:
+        logger.error(
+            f"File '{file_name}' doesn't exist. Cannot upload the file.",
+        )
+        return None
+    if uploaded:
+        logger.info(f"Uploaded file '{file_name}' successfully.")
+    else:
+        logger.error(f"Failed to upload file '{file_name}'.")
+    logger.info(f"Removing file: '{file_name}'")
+    helpers.safe_remove_csv(file_name, logger)
+    return uploaded
+
+
+def upload_failed(
+        future: concurrent.futures.Future, logger: logging.Logger,
+) -> bool:
+    """Returns True if the finished upload in 'future' failed. An exception
+    raised by the upload is logged and counted as a failure so that it
+    doesn't stop the uploader thread."""
+    try:
+        return future.result() is False
+    except Exception as e:
+        logger.error(f"Unexpected error while uploading file: {e!r}")
+        return True
+
+
 def uploader(
-        file_queue: queue.Queue, bucket_name: str, max_error_count: int,
-        csv_writer_exit_event: threading.Event,
-        sigint_event: threading.Event,
+        file_queue: multiprocessing.Queue, bucket_name: str,
+        max_error_count: int,
+        csv_writer_exit_event: multiprocessing.Event,
+        sigint_event: multiprocessing.Event,
         log_queue,
 ) -> None:
     """Main entry point for uploader thread."""
@@ -95,6 +166,29 @@ def uploader(
     logger.info("Creating S3 client.")
     s3_client = create_s3_client()
 
+    # Open a connection now so the first upload doesn't pay for the TLS
+    # handshake
+    try:
+        s3_client.head_bucket(Bucket=bucket_name)
+    except botocore.exceptions.BotoCoreError as e:
+        logger.warning(f"Failed to connect to S3: {e}")
+    except botocore.exceptions.ClientError as e:
+        logger.warning(f"Failed to access bucket {bucket_name}: {e}")
+
+    # Uploads run in worker threads so that several files can be in flight
+    # at once. boto3 clients are thread-safe.
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=UPLOAD_MAX_WORKERS,
+    )
+    pending_uploads = set()
+
+    def collect_finished_uploads() -> int:
+        """Removes finished uploads from the pending set. Returns the number
+        of failed uploads."""
+        finished = {future for future in pending_uploads if future.done()}
+        pending_uploads.difference_update(finished)
+        return sum(upload_failed(future, logger) for future in finished)
+
     upload_error_count = 0
     while upload_error_count < max_error_count:
 
@@ -102,40 +196,45 @@ def uploader(
         if sigint_event.is_set():
             break
 
-        # Only block if the csv_writer thread hasn't terminated
-        if not csv_writer_exit_event.is_set():
-            file_name = file_queue.get()
+        if len(pending_uploads) >= UPLOAD_MAX_WORKERS:
+            # Only take files from the queue when a worker is free. Files
+            # then back up in the bounded file queue, and the csv_writer
+            # skips files instead of filling up the disk.
+            concurrent.futures.wait(
+                pending_uploads, timeout=QUEUE_POLL_INTERVAL,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
         else:
+            # Check before waiting so a file queued right before the
+            # csv_writer exited is still uploaded
+            csv_writer_exited = csv_writer_exit_event.is_set()
             try:
-                file_name = file_queue.get(block=False)
+                file_name = file_queue.get(timeout=QUEUE_POLL_INTERVAL)
             except queue.Empty:
-                logger.debug("Queue is empty and csv_writer has exited")
-                break
+                if csv_writer_exited:
+                    logger.debug("Queue is empty and csv_writer has exited")
+                    break
+            else:
+                # Attempt to upload the file
+                pending_uploads.add(
+                    executor.submit(
+                        upload_and_remove,
+                        s3_client, file_name, bucket_name, logger,
+                    ),
+                )
 
-        # Exit if receive None object
-        if file_name is None:
-            logger.info("Received termination message from queue.")
-            break
+        failed_uploads = collect_finished_uploads()
+        if failed_uploads:
+            upload_error_count += failed_uploads
+            logger.error(f"Total upload errors: {upload_error_count}")
+
+    # Finish in-flight uploads unless exiting because of a keyboard interrupt
+    executor.shutdown(wait=True, cancel_futures=sigint_event.is_set())
+    upload_error_count += sum(
+        upload_failed(future, logger) for future in pending_uploads
+        if not future.cancelled()
+    )
 
-        # Attempt to upload the file
-        if os.path.exists(file_name):
-            uploaded = upload_file(
-                s3_client, file_name, bucket_name, logger=logger,
-            )
-            if not uploaded:
-                upload_error_count += 1
-                logger.error(
-                    f"Failed to upload file '{file_name}'. "
-                    f"Total upload errors: {upload_error_count}",
-                )
-            else:
-                logger.info(f"Uploaded file '{file_name}' successfully.")
-            logger.info(f"Removing file: '{file_name}'")
-            helpers.safe_remove_csv(file_name, logger)
-        else:
-            logger.error(
-                f"File '{file_name}' doesn't exist. Cannot upload the file.",
-            )
     if upload_error_count >= max_error_count:
         logger.error(
             f"Total upload errors: {upload_error_count} exceeds maximum "
@@ -1,13 +1,16 @@
 import logging
 import multiprocessing
-import os
 import queue
 import re
 import subprocess
 import threading
 import time
 
-from raspi_remoteid_receiver.core import setup_logging
+from raspi_remoteid_receiver.core import helpers, setup_logging
+
+# Compiled once since these run on every channel hop
+_PHY_RE = re.compile(r"phy\d+")
+_MON_RE = re.compile(r"wlan[0-9]+(?:mon)?")
 
 
 class InvalidInterfaceName(Exception):
@@ -26,11 +29,41 @@ class IllegalChannel(Exception):
     """Illegal Channel"""
 
 
+# Channels are kept as strings since they are passed straight to iw
+TWO_GHZ_CHANNELS = tuple(str(ch) for ch in range(1, 14))  # Channels 1-13
+LOWER_FIVE_GHZ_CHANNELS = ("36", "40", "44", "48")
+UPPER_FIVE_GHZ_CHANNELS = ("149", "153", "157", "161")
+ALL_WIFI_CHANNELS = (
+    TWO_GHZ_CHANNELS + LOWER_FIVE_GHZ_CHANNELS + UPPER_FIVE_GHZ_CHANNELS
+)
+
+# Linear sweep through the non-overlapping channels with an emphasis on the
+# 2.4 GHz channels. Each entry is (channel, scan time in seconds).
+DEFAULT_CHANNEL_SWEEP = (
+    ("1", 0.5),
+    ("6", 20.5),
+    ("11", 0.5),
+    ("36", 0.25),
+    ("40", 0.25),
+    ("44", 0.25),
+    ("48", 0.25),
+    ("1", 0.5),
+    ("6", 20.5),
+    ("11", 0.5),
+    ("149", 0.25),
+    ("153", 0.25),
+    ("157", 0.25),
+    ("161", 0.25),
+)
+
+
 class ChannelDictionary:
     """Object which contains information about recent Remote ID
     transmissions."""
 
     def __init__(self, channel_queue: queue.Queue, supported_channels: list):
+        """channel_queue receives the channel, as a string, of every
+        received Remote ID packet."""
         self.queue = channel_queue
         self.supported_channels = supported_channels
 
@@ -44,35 +77,15 @@ class ChannelDictionary:
         """Sets the channel sweep to be a linear sweep through the
         non-overlapping channels with an emphasis on the 2.4 GHz channels."""
         self.channels = [
-            ("1", 0.5),
-            ("6", 20.5),
-            ("11", 0.5),
-            ("36", 0.25),
-            ("40", 0.25),
-            ("44", 0.25),
-            ("48", 0.25),
-            ("1", 0.5),
-            ("6", 20.5),
-            ("11", 0.5),
-            ("149", 0.25),
-            ("153", 0.25),
-            ("157", 0.25),
-            ("161", 0.25),
+            (ch, t) for (ch, t) in DEFAULT_CHANNEL_SWEEP
+            if ch in self.supported_channels
         ]
 
     @staticmethod
     def _create_channel_packet_count():
         """Initializes the channel packet count list with all possible
         Wi-Fi channels."""
-        two_ghz_chs = list(range(1, 14))  # Channels 1-13
-        lower_five_ghz_chs = list(range(36, 49, 4))  # 36, 40, 44, 48
-        upper_five_ghz_chs = list(range(149, 162, 4))  # 149, 153, 157, 161
-        channels = two_ghz_chs + lower_five_ghz_chs + upper_five_ghz_chs
-
-        ch_pkt_count = {}
-        for ch in channels:
-            ch_pkt_count[str(ch)] = 0
-        return ch_pkt_count
+        return dict.fromkeys(ALL_WIFI_CHANNELS, 0)
 
     def reset_channel_packet_count(self):
         """Resets all stored information about Remote ID packet counts for
@@ -83,14 +96,15 @@ class ChannelDictionary:
     def update(self):
         """Updates the channel sweep"""
 
-        queue_is_empty = False
-        while not queue_is_empty:
+        # Channels are queued as strings, the same keys as ch_pkt_count
+        get_nowait = self.queue.get_nowait
+        ch_pkt_count = self.ch_pkt_count
+        while True:
             try:
-                ch = self.queue.get(block=False)
+                ch = get_nowait()
             except queue.Empty:
-                queue_is_empty = True
-                continue
-            self.ch_pkt_count[str(ch)] += 1
+                break
+            ch_pkt_count[ch] = ch_pkt_count.get(ch, 0) + 1
 
         # TODO: do something with the number of Remote ID packets received on
         # TODO: each channel
@@ -102,10 +116,13 @@ class ChannelDictionary:
     def remove(self, channel: str) -> None:
         """Removes a channel from the channel sweep and supported channel
         list."""
-        self.supported_channels = [
-            x for x in self.supported_channels
-            if x != channel
-        ]
+        # Supported channels are unique, so remove the entry in place
+        try:
+            self.supported_channels.remove(channel)
+        except ValueError:
+            pass
+        # The sweep is rebuilt rather than changed in place since the sweeper
+        # may be iterating over it
         self.channels = [
             (ch, t) for (ch, t) in self.channels
             if ch != channel
@@ -125,12 +142,18 @@ def sanitize_physical_interface_name(phy_name: str) -> str:
     - phy1wlan1mon
     """
     interface_name = phy_name.strip()
-    if not re.match(r"^phy\d+$", interface_name):
+    if not _PHY_RE.fullmatch(interface_name):
         raise InvalidInterfaceName(interface_name)
     return interface_name
 
 
-def sanitize_mon_interface_name(mon_name: str) -> str:
+class MonIfName(str):
+    """Monitor interface name which has already been sanitized. Only created
+    by sanitize_mon_interface_name()."""
+    __slots__ = ()
+
+
+def sanitize_mon_interface_name(mon_name: str) -> MonIfName:
     """Sanitizes interface name. Throws InvalidInterfaceName error if invalid.
     Example valid interface names:
     - wlan0
@@ -144,10 +167,12 @@ def sanitize_mon_interface_name(mon_name: str) -> str:
     - en0
     - eth0
     """
+    if isinstance(mon_name, MonIfName):
+        return mon_name
     interface_name = mon_name.strip()
-    if not re.match(r"^wlan[0-9]+(mon)?$", interface_name):
+    if not _MON_RE.fullmatch(interface_name):
         raise InvalidInterfaceName(interface_name)
-    return interface_name
+    return MonIfName(interface_name)
 
 
 def get_supported_channel_list(
@@ -157,7 +182,8 @@ def get_supported_channel_list(
     Returns None if there are no supported channels.
     """
 
-    # Sanitize interface name input since running with shell=True
+    # Sanitize interface name input since it is used in a file path and
+    # passed to iw
     try:
         phy = sanitize_physical_interface_name(phy)
     except InvalidInterfaceName:
@@ -171,37 +197,37 @@ def get_supported_channel_list(
 
     # Validate physical wireless interface name
     phy_file_name = f"/sys/class/net/{mon}/phy80211/name"
-    if not os.path.exists(phy_file_name):
+    logger.info(f"Reading file: {phy_file_name}")
+    try:
+        with open(phy_file_name, encoding="utf-8") as phy_file:
+            output = phy_file.read()
+    except FileNotFoundError:
         logger.error(f"Ensure that {phy_file_name} exists.")
         return None
-    phy_name_cmd = f"cat \"{phy_file_name}\""  # Prints file contents
-    logger.info(f"Running command: {phy_name_cmd}")
-    try:
-        output = subprocess.check_output(
-            phy_name_cmd, shell=True, text=True,
-            stderr=subprocess.STDOUT,
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error(f"CalledProcessError: {e}")
-        logger.error(f"STDOUT: {e.stdout}")
+    except OSError as e:
+        logger.error(f"Failed to read {phy_file_name}: {e}")
         return None
     output = output.strip()
-    logger.info(f"STDOUT: {output}\n")
+    logger.info(f"Contents: {output}\n")
     if phy != output:
         logger.error(f"Given interface {phy} doesn't match {output}.")
         return None
 
     # Get the supported channels separated by new lines (from airmon-ng code)
     # Standard error is redirected to standard output
-    get_channels_cmd = f"sudo iw phy {phy} channels 2>&1"
+    get_channels_cmd = ["sudo", "iw", "phy", phy, "channels"]
 
-    logger.info(f"Running command: {get_channels_cmd}")
+    logger.info(f"Running command: {' '.join(get_channels_cmd)}")
     try:
         output = subprocess.check_output(
             get_channels_cmd,
-            shell=True,
             text=True,  # Makes output a string,
+            stderr=subprocess.STDOUT,
+            env=helpers.SUBPROCESS_ENV,
         )
+    except FileNotFoundError:
+        logger.error("Ensure that sudo and iw are installed.")
+        return None
     except subprocess.CalledProcessError as e:
         logger.error(f"CalledProcessError: {e}")
         if e.returncode == 127:
@@ -215,13 +241,11 @@ def get_supported_channel_list(
     supported_channels_list = []
     # For every line, get the first number inside brackets on the line
     for line in lines:
-        # Separate line by brackets: '[' or ']'
-        fields = re.split(r'\[|\]', line)
-
-        # If there are at least three elements, there is a channel enclosed
-        # by brackets, which is the second element (Python is 0-indexed).
-        if len(fields) > 2:
-            supported_channels_list.append(fields[1])
+        # If both brackets were found, there is a channel enclosed by them
+        _, left_bracket, rest = line.partition("[")
+        channel, right_bracket, _ = rest.partition("]")
+        if left_bracket and right_bracket:
+            supported_channels_list.append(channel)
 
     # Check if list is empty
     if not supported_channels_list:
@@ -231,13 +255,16 @@ def get_supported_channel_list(
     return supported_channels_list
 
 
-def set_channel(mon: str, channel: str, logger: logging.Logger) -> str:
+def set_channel(
+        mon: MonIfName | str, channel: str, logger: logging.Logger,
+) -> str:
     """Tries to set the given monitor mode interface to the given channel.
     Throws an error if unsuccessful."""
 
+    # Returns immediately for names that were already sanitized
     mon = sanitize_mon_interface_name(mon)
 
-    # Sanitize channel input since running with shell=True
+    # Sanitize channel input before passing it to iw
     if not channel.isdigit():
         logger.error(
             f"Channel: {channel} is not a number. Cannot set "
@@ -245,12 +272,14 @@ def set_channel(mon: str, channel: str, logger: logging.Logger) -> str:
         )
         raise ValueError(channel)
 
-    set_channel_cmd = f"sudo iw dev {mon} set channel {channel}"
-    logger.info(f"Running command: {set_channel_cmd}")
+    # Run iw directly instead of through a shell to avoid spawning an extra
+    # /bin/sh process on every channel hop
+    set_channel_cmd = ["sudo", "iw", "dev", mon, "set", "channel", channel]
+    logger.info(f"Running command: {' '.join(set_channel_cmd)}")
     try:
         subprocess.check_output(
-            set_channel_cmd, shell=True, text=True,
-            stderr=subprocess.STDOUT,
+            set_channel_cmd, text=True,
+            stderr=subprocess.STDOUT, env=helpers.SUBPROCESS_ENV,
         )
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to switch to channel {channel}.")
@@ -279,36 +308,43 @@ def setup_wifi_interface(logger: logging.Logger) -> tuple[str, str]:
     successful. Otherwise, throws an error."""
 
     # Kill any network processes that might interfere with monitor mode
-    check_kill_cmd = "sudo airmon-ng check kill"
-    logger.info(f"Running command: {check_kill_cmd}")
+    # Commands are run directly instead of through a shell so that no extra
+    # /bin/sh process is spawned for each one
+    check_kill_cmd = ["sudo", "airmon-ng", "check", "kill"]
+    logger.info(f"Running command: {' '.join(check_kill_cmd)}")
     try:
-        subprocess.run(
-            check_kill_cmd, shell=True, check=True,
-            stderr=subprocess.STDOUT,
+        subprocess.check_output(
+            check_kill_cmd, text=True,
+            stderr=subprocess.STDOUT, env=helpers.SUBPROCESS_ENV,
         )
     except subprocess.CalledProcessError as e:
         logger.error(f"Error: {e}")
         if e.stdout is not None:
             logger.error(f"STDOUT:\n{e.stdout.strip()}\n")
-        if "sudo: a password is required" in e.stdout:
-            logger.critical("Insufficient permission to run script.")
-            raise PermissionError
+            if "sudo: a password is required" in e.stdout:
+                logger.critical("Insufficient permission to run script.")
+                raise PermissionError
         raise subprocess.CalledProcessError from e
 
     wifi_card_driver = "mt76x0u"  # TODO: make this compatible with more devices
     logger.info("Checking for available interfaces.")
-    list_interfaces_cmd = f"sudo airmon-ng | awk '/{wifi_card_driver}" + \
-        "/{print $1,$2}'"  # not f-string
-    logger.info(f"Running command: {list_interfaces_cmd}")
+    list_interfaces_cmd = ["sudo", "airmon-ng"]
+    logger.info(f"Running command: {' '.join(list_interfaces_cmd)}")
     try:
-        output = subprocess.check_output(
-            list_interfaces_cmd, shell=True,
-            text=True, stderr=subprocess.STDOUT,
+        airmon_output = subprocess.check_output(
+            list_interfaces_cmd, text=True,
+            stderr=subprocess.STDOUT, env=helpers.SUBPROCESS_ENV,
         )
     except subprocess.CalledProcessError as e:
         logger.error(e)
         logger.error(e.output)
         raise subprocess.CalledProcessError from e
+    # Keep the first two fields of lines using the driver (replaces awk)
+    output = "\n".join(
+        " ".join(line.split()[:2])
+        for line in airmon_output.splitlines()
+        if wifi_card_driver in line
+    )
 
     # Get the physical interface name and the virtual interface name
     # Match phy<num>, then wlan<num>, wlan<num>mon, or wlx<mac-addr>
@@ -326,12 +362,12 @@ def setup_wifi_interface(logger: logging.Logger) -> tuple[str, str]:
     logger.info(f"phy: {phy_name}, mon: {mon_name}")
 
     # Start the interface in monitor mode
-    start_cmd = f"sudo airmon-ng start {mon_name}"
+    start_cmd = ["sudo", "airmon-ng", "start", mon_name]
     logger.info(f"Starting monitor mode: {mon_name}")
     try:
         output = subprocess.check_output(
-            start_cmd, shell=True, text=True,
-            stderr=subprocess.STDOUT,
+            start_cmd, text=True,
+            stderr=subprocess.STDOUT, env=helpers.SUBPROCESS_ENV,
         )
     except subprocess.CalledProcessError as e:
         logger.error(f"Error: {e}")
@@ -348,7 +384,7 @@ def setup_wifi_interface(logger: logging.Logger) -> tuple[str, str]:
         if phy_name != match.group(1):
             logger.info(f"Expected '{phy_name}' but found '{match.group(1)}'.")
             raise RuntimeError
-        mon_name = match.group(2)
+        mon_name = sanitize_mon_interface_name(match.group(2))
     else:
         logger.error(f"No regex match found in output with regex: {regex_str}")
         logger.error(f"Output: {output}")
@@ -366,6 +402,7 @@ def setup_bluetooth_interface(logger: logging.Logger) -> str:
             shell=True,
             text=True,
             stderr=subprocess.STDOUT,
+            env=helpers.SUBPROCESS_ENV,
         )
     except subprocess.CalledProcessError as exc:
         logger.error(f"Error: {exc}")
@@ -395,9 +432,14 @@ def wifi_channel_sweeper(
     channel_dict = ChannelDictionary(channel_queue, supported_channels)
 
     while not sleep_event.is_set():
+        if not channel_dict.get_channels():
+            raise NoSupportedChannels(str((phy, mon)))
         for channel, scan_time in channel_dict.get_channels():
             if sigint_event.is_set():
                 raise KeyboardInterrupt
+            # The scan time includes the time it takes to switch channels,
+            # which can be hundreds of milliseconds on some USB adapters
+            deadline = time.monotonic() + scan_time
             try:
                 set_channel(mon, channel, logger)
             except IllegalChannel:
@@ -414,7 +456,11 @@ def wifi_channel_sweeper(
             except InterfaceNoLongerInMonitorMode as e:
                 raise RuntimeError(e)
 
-            time.sleep(scan_time)
+            # Wait on the SIGINT event instead of sleeping so that shutdown
+            # doesn't have to wait out a long scan time
+            remaining_time = max(0.0, deadline - time.monotonic())
+            if sigint_event.wait(timeout=remaining_time):
+                raise KeyboardInterrupt
         channel_dict.update()
 
     logger.info("Sleep event received.")
@@ -1,10 +1,13 @@
+import collections
 import csv
+import io
 import logging
 import multiprocessing
+import operator
 import os
 import queue
 import re
-import threading
+import signal
 import time
 import uuid
 import pathlib
@@ -12,6 +15,40 @@ import pathlib
 # Local files
 from raspi_remoteid_receiver.core import helpers, setup_logging
 
+# Compiled once since this runs on every packet
+_SRC_ADDR_RE = re.compile(r"(?:MAC|BDA)-(?:[0-9A-F]{2}:){5}[0-9A-F]{2}")
+
+# ASCII characters removed from unique IDs: everything except letters,
+# digits, underscore, dash and space
+_UID_ALLOWED_CHARS = (
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_- "
+)
+_UID_DELETE_CHARS = bytes(
+    c for c in range(128) if c not in _UID_ALLOWED_CHARS
+)
+
+# Fetches the remaining location message fields in a single call
+_get_location_fields = operator.attrgetter(
+    "opendroneid_loc_direction",
+    "opendroneid_loc_speed",
+    "opendroneid_loc_vspeed",
+    "opendroneid_loc_lat",
+    "opendroneid_loc_lon",
+)
+
+# Write buffer size for CSV files and number of rows written at once
+CSV_FILE_BUFFER_SIZE = 1 << 20  # 1 MiB
+CSV_ROW_BATCH_SIZE = 32
+
+# Seconds between checks of the SIGINT event while waiting on a queue
+QUEUE_POLL_INTERVAL = 0.25
+
+# Maximum number of packets taken from the packet queue at once
+PACKET_BURST_SIZE = 64
+
+# Maximum number of rows handled between reads of the clock
+CLOCK_CHECK_INTERVAL = 16
+
 header_row = [
     "Source Address", "Unique ID", "Timestamp", "Heading",
     "Ground Speed", "Vertical Speed", "Latitude", "Longitude",
@@ -21,6 +58,36 @@ header_row = [
 ]
 
 
+def clean_unique_id(unique_id: str) -> str:
+    """Removes every character from the unique ID except ASCII letters,
+    digits, underscores, dashes and spaces, and strips whitespace."""
+    # Encoding drops non-ASCII characters, translate deletes the rest
+    return unique_id.encode("ascii", errors="ignore") \
+        .translate(None, _UID_DELETE_CHARS).decode("ascii").strip()
+
+
+# Line terminator used by csv.writer with the default dialect
+CSV_LINE_TERMINATOR = "\r\n"
+
+
+def format_csv_row(row) -> str:
+    """Returns the row as one line of CSV, formatted the same way as
+    csv.writer with the default dialect. Values are joined directly unless
+    one of them needs quoting, in which case the csv module is used.
+    """
+    line = ",".join(map(str, row))
+    # Any comma beyond the separators, quote or line break needs quoting
+    if line.count(",") == len(row) - 1 and '"' not in line \
+            and "\n" not in line and "\r" not in line:
+        return line + CSV_LINE_TERMINATOR
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+header_line = format_csv_row(header_row)
+
+
 class PacketError(Exception):
     """Packet does not use the Open Drone ID protocol or is invalid."""
 
@@ -47,24 +114,27 @@ def is_valid_src_addr(src_addr: str) -> bool:
         MAC-ff:ff:ff:ff:ff:ff
         bda-00:11:22:33:44:55
     """
-    if src_addr is None:
+    # Cheap checks first so malformed addresses never reach the regex
+    if src_addr is None or len(src_addr) != 21 \
+            or src_addr[:4] not in ("MAC-", "BDA-"):
         return False
-    match = re.match(
-        r'\A(?:MAC|BDA)-(?:[0-9A-F]{2}:){5}[0-9A-F]{2}\Z', src_addr,
-    )
-    return match is not None
+    return _SRC_ADDR_RE.fullmatch(src_addr) is not None
 
 
-class CSVCreatorThread(threading.Thread):
+class CSVCreatorProcess(multiprocessing.Process):
+    """Process which serializes packets from the packet queue into CSV files.
+    Runs in its own process so that parsing packets doesn't compete for the
+    GIL with the log queue listener and uploader in the main process."""
 
     def __init__(
             self,
             packet_queue: multiprocessing.Queue,
             log_queue: multiprocessing.Queue,
-            upload_file_queue: queue.Queue,
-            exit_event: threading.Event,
-            sleep_event: threading.Event,
-            sigint_event: threading.Event,
+            upload_file_queue: multiprocessing.Queue,
+            exit_event: multiprocessing.Event,
+            sleep_event: multiprocessing.Event,
+            sigint_event: multiprocessing.Event,
+            logging_level: int = logging.INFO,
             max_packet_count: int = 100,
             max_elapsed_time: int | float = 30,  # 30 seconds
             upload_file_queue_timeout: int = 5,  # 5 seconds
@@ -73,19 +143,37 @@ class CSVCreatorThread(threading.Thread):
     ) -> None:
         super().__init__(**kwargs)
         self._packet_queue = packet_queue
+        self._log_queue = log_queue
         self._upload_file_queue = upload_file_queue
         self._exit_event = exit_event
         self._sleep_event = sleep_event
         self._sigint_event = sigint_event
+        # The root logger isn't configured in a spawned process, so the level
+        # has to be passed in explicitly
+        self._logging_level = logging_level
         self._max_packet_count = max_packet_count
         self._max_elapsed_time = max_elapsed_time
         self._upload_file_queue_timeout = upload_file_queue_timeout
         self._packet_timeout = packet_timeout
 
-        self.logger = setup_logging.get_logger(__name__, log_queue)
+        # Set up in run() since loggers can't be sent to a spawned process
+        self.logger = None
         self.tmp_directory = None
 
+        # Packets taken from the packet queue in a burst but not parsed yet
+        self._pending_packets = collections.deque()
+
+        # Last UTC hour and formatted hour prefix in _format_remoteid_ts()
+        self._last_utc_hour = None
+        self._last_utc_hour_prefix = ""
+
     def run(self):
+        # SIGINT is handled by the main process, which sets the SIGINT event
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self.logger = setup_logging.get_logger(
+            __name__, self._log_queue, logging_level=self._logging_level,
+        )
+
         self.tmp_directory = self.choose_tmp_csv_directory()
         self.clean_tmp_csv_directory()
 
@@ -96,7 +184,7 @@ class CSVCreatorThread(threading.Thread):
                 break
 
             # Create a new .csv file with a unique hash for the filename
-            base_name = "remote-id-" + str(uuid.uuid4()) + ".csv"
+            base_name = f"remote-id-{uuid.uuid4().hex}.csv"
             file_name = pathlib.PurePath(self.tmp_directory, base_name)
 
             packet_count = 0  # number of packets in the current csv file
@@ -105,26 +193,41 @@ class CSVCreatorThread(threading.Thread):
             # any existing data if the file already exists (which it shouldn't)
             with open(
                     file_name, "w", newline="", encoding="utf-8",
+                    buffering=CSV_FILE_BUFFER_SIZE,
             ) as csv_file:
                 self.logger.info("Opened file: '%s'", file_name)
-                writer = csv.writer(csv_file)
-
-                writer.writerow(header_row)
 
-                current_time = time.monotonic()
+                csv_file.write(header_line)
+
+                # Rows are written in batches to cut per-call overhead. A
+                # partial batch is written when the file is closed, and
+                # written rows stay in the file buffer until then anyway.
+                lines = []
+
+                # Local names for everything used on every packet
+                sigint_is_set = self._sigint_event.is_set
+                get_packet = self.get_packet
+                create_row = self.create_row
+                append_line = lines.append
+                write = csv_file.write
+                pending_packets = self._pending_packets
+                monotonic = time.monotonic
+                max_packet_count = self._max_packet_count
+                max_elapsed_time = self._max_elapsed_time
+
+                current_time = monotonic()
                 elapsed_time = 0
+                rows_since_clock_check = 0
 
-                while packet_count <= self._max_packet_count \
-                        and elapsed_time < self._max_elapsed_time:
+                while packet_count <= max_packet_count \
+                        and elapsed_time < max_elapsed_time:
 
-                    if self._sigint_event.is_set():
+                    if sigint_is_set():
                         # Detected KeyboardInterrupt in main thread
                         break
 
                     try:
-                        pkt = self._packet_queue.get(
-                            timeout=self._packet_timeout,
-                        )
+                        pkt = get_packet()
                     except queue.Empty:
                         self.logger.info("Timed out waiting for new packet.")
                         go_again = False
@@ -138,27 +241,38 @@ class CSVCreatorThread(threading.Thread):
                         break
 
                     try:
-                        row = self.create_row(pkt)
+                        row = create_row(pkt)
                     except PacketError as e:
-                        self.logger.error(f"Error parsing packet: {repr(e)}")
+                        self.logger.error("Error parsing packet: %r", e)
                         continue
                     except TypeError as e:
                         self.logger.error(
-                            f"TypeError when parsing packet: {repr(e)}",
+                            "TypeError when parsing packet: %r", e,
                         )
                         continue
-                    writer.writerow(row)
+                    append_line(format_csv_row(row))
                     packet_count += 1
-                    elapsed_time = time.monotonic() - current_time
-
-                self.logger.info(f"Closing file with {packet_count} packets.")
+                    rows_since_clock_check += 1
+                    # Packets from the same burst arrive together, so only
+                    # read the clock once the burst is used up or every few
+                    # rows of a long burst
+                    if not pending_packets \
+                            or rows_since_clock_check >= CLOCK_CHECK_INTERVAL:
+                        rows_since_clock_check = 0
+                        elapsed_time = monotonic() - current_time
+                    if len(lines) >= CSV_ROW_BATCH_SIZE:
+                        write("".join(lines))
+                        lines.clear()
+
+                csv_file.write("".join(lines))
+                self.logger.info("Closing file with %d packets.", packet_count)
 
             if self._sigint_event.is_set():
                 self.logger.info(
-                    f"Detected SIGINT event. Deleting {file_name}",
+                    "Detected SIGINT event. Deleting %s", file_name,
                 )
                 helpers.safe_remove_csv(file_name, self.logger)
-                self.logger.info("Exiting thread...")
+                self.logger.info("Exiting process...")
                 return None
 
             # Send file to be uploaded if not empty
@@ -171,22 +285,49 @@ class CSVCreatorThread(threading.Thread):
                     )
                 except queue.Full:
                     self.logger.error(
-                        f"Upload file queue is full, skipping "
-                        f"file '{file_name}'.",
+                        "Upload file queue is full, skipping file '%s'.",
+                        file_name,
                     )
                     helpers.safe_remove_csv(file_name, self.logger)
             else:
                 self.logger.info("Removing file with no packets.")
                 helpers.safe_remove_csv(file_name, self.logger)
 
-        # Exit event is set before adding None element to queue to guarantee
-        # the uploader will not block indefinitely on an empty queue
+        # The uploader exits once this is set and the upload queue is empty
         self._exit_event.set()
-        try:
-            self._upload_file_queue.put(None, block=False)
-        except queue.Full:
-            pass
-        self.logger.info("Exiting thread...")
+        self.logger.info("Exiting process...")
+
+    def get_packet(self):
+        """Waits for the next packet from the packet queue while regularly
+        checking the SIGINT event. Returns None if the SIGINT event is set.
+        Raises queue.Empty if no packet arrives within the packet timeout.
+        """
+        if self._pending_packets:
+            return self._pending_packets.popleft()
+        deadline = time.monotonic() + self._packet_timeout
+        while not self._sigint_event.is_set():
+            timeout = min(QUEUE_POLL_INTERVAL, deadline - time.monotonic())
+            if timeout <= 0:
+                raise queue.Empty
+            try:
+                pkt = self._packet_queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            self.drain_packet_queue()
+            return pkt
+        return None
+
+    def drain_packet_queue(self) -> None:
+        """Moves packets which are already waiting in the packet queue into
+        the pending packets without blocking, so bursts are handled without
+        a timed wait per packet."""
+        get_nowait = self._packet_queue.get_nowait
+        pending_packets = self._pending_packets
+        while len(pending_packets) < PACKET_BURST_SIZE:
+            try:
+                pending_packets.append(get_nowait())
+            except queue.Empty:
+                break
 
     def choose_tmp_csv_directory(self) -> pathlib.Path:
         """Chooses a temporary directory to store CSV files. Returns the file
@@ -205,8 +346,8 @@ class CSVCreatorThread(threading.Thread):
                 )
             case _:
                 self.logger.error(
-                    f"Unknown OS {os_name}. Using current directory to "
-                    f"store temporary files.",
+                    "Unknown OS %s. Using current directory to "
+                    "store temporary files.", os_name,
                 )
                 tmp_directory = "tmp"
         tmp_directory = pathlib.Path(tmp_directory, "remote-id-data")
@@ -217,7 +358,7 @@ class CSVCreatorThread(threading.Thread):
         from previous runs.
         """
 
-        self.logger.info(f"Storing temporary files in {self.tmp_directory}")
+        self.logger.info("Storing temporary files in %s", self.tmp_directory)
         try:
             self.tmp_directory.mkdir(parents=True, exist_ok=False)
         except FileExistsError:
@@ -225,19 +366,32 @@ class CSVCreatorThread(threading.Thread):
                 "Directory already exists,deleting existing files.",
             )
             # If the folder exists, there may be leftover files from a
-            # previous run
-            for (dir_name, _, base_names) in os.walk(
-                self.tmp_directory,
-                followlinks=False,  # don't follow symlinks
-            ):
-                # Delete all files in the tmp directory
-                for base_name in base_names:
-                    file_path = pathlib.PurePath(dir_name, base_name)
-                    self.logger.info(f"Removing file: '{file_path}'")
-                    helpers.safe_remove_csv(file_path, self.logger)
-                break  # Don't recursively walk through directories
-
-    def create_row(self, pkt) -> list:
+            # previous run. Delete all CSV files in the tmp directory, but
+            # don't recurse into directories or follow symlinks.
+            with os.scandir(self.tmp_directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".csv") \
+                            or not entry.is_file(follow_symlinks=False):
+                        continue
+                    self.logger.info("Removing file: '%s'", entry.path)
+                    helpers.safe_remove_csv(entry.path, self.logger)
+
+    def _format_remoteid_ts(self, utc_ts: int, tenth: int) -> str:
+        """Formats a UTC timestamp in whole seconds plus tenths of a second
+        as 'YYYY-MM-DD HH:MM:SS.T'. The date and hour are only formatted
+        when the hour changes; minutes and seconds are formatted directly.
+        """
+        utc_hour, seconds_into_hour = divmod(utc_ts, 3600)
+        if utc_hour != self._last_utc_hour:
+            self._last_utc_hour = utc_hour
+            self._last_utc_hour_prefix = time.strftime(
+                '%Y-%m-%d %H:',
+                time.gmtime(utc_hour * 3600),
+            )
+        minute, second = divmod(seconds_into_hour, 60)
+        return f"{self._last_utc_hour_prefix}{minute:02d}:{second:02d}.{tenth}"
+
+    def create_row(self, pkt) -> tuple:
         """Creates a table of elements corresponding to one row of the CSV.
         It looks like PyShark generates the format of the packet by taking the
         display filter for that field from Wireshark and replacing all periods
@@ -262,12 +416,11 @@ class CSVCreatorThread(threading.Thread):
             except AttributeError:
                 self.logger.info("Missing Source Address")
                 raise MissingPacketFieldError("Missing Source Address")
-            src_addr = "MAC-" + src_addr
+            src_addr = f"MAC-{src_addr.upper()}"
         else:
-            src_addr = "BDA-" + src_addr
-        src_addr = src_addr.upper()
+            src_addr = f"BDA-{src_addr.upper()}"
         if not is_valid_src_addr(src_addr):
-            self.logger.info(f"Invalid Source Address {src_addr}")
+            self.logger.info("Invalid Source Address %s", src_addr)
             raise InvalidPacketFieldError(
                 f"Invalid Source Address: {src_addr}",
             )
@@ -285,11 +438,10 @@ class CSVCreatorThread(threading.Thread):
         except AttributeError:
             raise MissingPacketFieldError("Missing Unique ID")
         # Remove non-alphanumeric characters and strip whitespace
-        unique_id = str(unique_id)
-        unique_id = re.sub(r"[^0-9a-zA-Z_\- ]+", "", unique_id).strip()
+        unique_id = clean_unique_id(str(unique_id))
         # ASTM F3411-22a Basic ID numbers should be max 20 characters
         if len(unique_id) > 20:
-            self.logger.info(f"Invalid Unique ID: {unique_id}")
+            self.logger.info("Invalid Unique ID: %s", unique_id)
             raise InvalidPacketFieldError(f"Invalid Unique ID: {unique_id}")
 
         # Timestamp
@@ -305,101 +457,81 @@ class CSVCreatorThread(threading.Thread):
         except AttributeError:
             self.logger.info("Missing UTC Time Since Hour")
             raise MissingPacketFieldError("Missing Location Message Timestamp")
-        epoch_timestamp = float(epoch_timestamp)
+        epoch_hour_start = int(float(epoch_timestamp)) // 3600 * 3600
         time_since_utc_hour = int(time_since_utc_hour) % 3600
-        remote_id_utc_timestamp = epoch_timestamp - (epoch_timestamp % 3600) \
-            + time_since_utc_hour // 10
+        remote_id_utc_timestamp = epoch_hour_start + time_since_utc_hour // 10
         # Check if drone is time traveling to the future
         # (usually happens when no GPS lock)
         now = round(time.time())  # number of seconds since epoch
         remote_id_utc_timestamp = min(remote_id_utc_timestamp, now)
-        timestamp = time.strftime(
-            '%Y-%m-%d %H:%M:%S',
-            time.gmtime(remote_id_utc_timestamp),
+        timestamp = self._format_remoteid_ts(
+            remote_id_utc_timestamp, time_since_utc_hour % 10,
         )
-        timestamp += "." + str(time_since_utc_hour % 10)
 
-        # Other
+        # Required Location Message fields, fetched together so a successful
+        # packet only sets up one exception handler
         try:
-            heading = opendroneid_data.opendroneid_loc_direction
-            gnd_speed = opendroneid_data.opendroneid_loc_speed
-            vert_speed = opendroneid_data.opendroneid_loc_vspeed
-            lat = opendroneid_data.opendroneid_loc_lat
-            lon = opendroneid_data.opendroneid_loc_lon
-        except AttributeError:
-            raise MissingPacketFieldError("Something in location message")
+            heading, gnd_speed, vert_speed, lat, lon = \
+                _get_location_fields(opendroneid_data)
+            geo_alt = opendroneid_data.opendroneid_loc_geoalt
+            geo_vert_acc = opendroneid_data.opendroneid_loc_vaccuracy
+            speed_acc = opendroneid_data.opendroneid_loc_speedaccuracy
+            horz_acc = opendroneid_data.opendroneid_loc_haccuracy
+        except AttributeError as e:
+            raise MissingPacketFieldError(
+                f"Missing Location Message field: {e}",
+            )
 
         # Geodetic Altitude
-        try:
-            geo_alt = opendroneid_data.opendroneid_loc_geoalt
-        except AttributeError:
-            raise MissingPacketFieldError("Missing Geodetic Altitude")
-        else:
-            # height is expected to be 16-bit unsigned int which can be safely
-            # represented as a 32-bit signed int
-            geo_alt = int(geo_alt)
-            # Perform inverse encoding from ASTM F3411-22a Table 6
-            geo_alt = geo_alt / 2 - 1000
-            # If value is not between -1000 and 31767.5, the number was not
-            # properly encoded as a 16 bit unsigned int
-            # use 0.001 as tolerance for floating point error
-            if not -1000.001 <= geo_alt <= 31767.501:
-                geo_alt = -1000
+        # height is expected to be 16-bit unsigned int which can be safely
+        # represented as a 32-bit signed int
+        geo_alt = int(geo_alt)
+        # Perform inverse encoding from ASTM F3411-22a Table 6
+        geo_alt = geo_alt / 2 - 1000
+        # If value is not between -1000 and 31767.5, the number was not
+        # properly encoded as a 16 bit unsigned int
+        # use 0.001 as tolerance for floating point error
+        if not -1000.001 <= geo_alt <= 31767.501:
+            geo_alt = -1000
 
         # Geodetic Vertical Accuracy
-        try:
-            geo_vert_acc = opendroneid_data.opendroneid_loc_vaccuracy
-        except AttributeError:
-            raise MissingPacketFieldError("Missing Geodetic Vertical Accuracy")
-        else:
-            # Value should be an int between 0 and 15
-            # can raise ValueError or TypeError
-            geo_vert_acc = int(geo_vert_acc)
-            if not 0 <= geo_vert_acc <= 15:
-                # TODO: maybe set to 0 (equivalent to '>= 10m/s' or 'unknown')
-                #  instead of raising error
-                raise InvalidPacketFieldError("Geodetic Vertical Accuracy")
+        # Value should be an int between 0 and 15
+        # can raise ValueError or TypeError
+        geo_vert_acc = int(geo_vert_acc)
+        if not 0 <= geo_vert_acc <= 15:
+            # TODO: maybe set to 0 (equivalent to '>= 10m/s' or 'unknown')
+            #  instead of raising error
+            raise InvalidPacketFieldError("Geodetic Vertical Accuracy")
 
         # Speed Accuracy
-        try:
-            speed_acc = opendroneid_data.opendroneid_loc_speedaccuracy
-        except AttributeError:
-            raise MissingPacketFieldError("Missing Speed Accuracy")
-        else:
-            speed_acc = int(speed_acc)
-            if speed_acc > 15:
-                self.logger.warning(
-                    "Invalid speed accuracy. Setting to unknown.",
-                )
-                speed_acc = 0
-            if speed_acc > 4:
-                self.logger.warning(
-                    "Reserved speed accuracy in ASTM F3411-22a.",
-                )
-            if speed_acc < 0:
-                self.logger.warning(
-                    "Negative speed accuracy. Possible conversion"
-                    "error from unsigned int to signed int.",
-                )
-                speed_acc = 0
+        speed_acc = int(speed_acc)
+        if speed_acc > 15:
+            self.logger.warning(
+                "Invalid speed accuracy. Setting to unknown.",
+            )
+            speed_acc = 0
+        if speed_acc > 4:
+            self.logger.warning(
+                "Reserved speed accuracy in ASTM F3411-22a.",
+            )
+        if speed_acc < 0:
+            self.logger.warning(
+                "Negative speed accuracy. Possible conversion"
+                "error from unsigned int to signed int.",
+            )
+            speed_acc = 0
 
         # Horizontal Accuracy
-        try:
-            horz_acc = opendroneid_data.opendroneid_loc_haccuracy
-        except AttributeError:
-            raise MissingPacketFieldError("Missing Horizontal Accuracy")
-        else:
-            horz_acc = int(horz_acc)
-            if not 0 <= horz_acc <= 15:
-                self.logger.warning(
-                    "Invalid horizontal accuracy. Setting to unknown.",
-                )
-                horz_acc = 0
+        horz_acc = int(horz_acc)
+        if not 0 <= horz_acc <= 15:
+            self.logger.warning(
+                "Invalid horizontal accuracy. Setting to unknown.",
+            )
+            horz_acc = 0
 
         # Barometric Altitude (optional in ASTM F3411-22a)
-        try:
-            baro_alt = opendroneid_data.opendroneid_loc_pressalt  # pressure alt
-        except AttributeError:
+        baro_alt = getattr(opendroneid_data, "opendroneid_loc_pressalt", None)
+        if baro_alt is None:
             # If Invalid, No Value, or Unknown => -1000 m
             baro_alt = -1000
         else:
@@ -414,9 +546,10 @@ class CSVCreatorThread(threading.Thread):
             if not -1000.001 <= baro_alt <= 31767.501:
                 baro_alt = -1000
 
-        try:
-            baro_alt_acc = opendroneid_data.opendroneid_loc_baroaccuracy
-        except AttributeError:
+        baro_alt_acc = getattr(
+            opendroneid_data, "opendroneid_loc_baroaccuracy", None,
+        )
+        if baro_alt_acc is None:
             # Is optional
             baro_alt_acc = 0
         else:
@@ -425,9 +558,8 @@ class CSVCreatorThread(threading.Thread):
             if not 0 <= baro_alt_acc <= 15:
                 baro_alt_acc = 0
 
-        try:
-            height = opendroneid_data.opendroneid_loc_height
-        except AttributeError:
+        height = getattr(opendroneid_data, "opendroneid_loc_height", None)
+        if height is None:
             # Field is optional, don't throw error if missing
             height = -1000
         else:
@@ -442,18 +574,16 @@ class CSVCreatorThread(threading.Thread):
             if not -1000.001 <= height <= 31767.501:
                 height = -1000
 
-        try:
-            height_type = opendroneid_data.opendroneid_loc_flag_heighttype
-        except AttributeError:
-            # Field is optional, don't throw error if missing
+        # Field is optional, don't throw error if missing
+        height_type = getattr(
+            opendroneid_data, "opendroneid_loc_flag_heighttype", 0,
+        )
+        if height_type not in (0, 1):
             height_type = 0
-        else:
-            if height_type not in (0, 1):
-                height_type = 0
 
-        row = [
+        row = (
             src_addr, unique_id, timestamp, heading, gnd_speed, vert_speed,
             lat, lon, geo_alt, speed_acc, horz_acc, geo_vert_acc, baro_alt,
             baro_alt_acc, height, height_type,
-        ]
+        )
         return row
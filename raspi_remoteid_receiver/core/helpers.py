@@ -6,6 +6,18 @@ import time
 
 from raspi_remoteid_receiver.core import setup_logging
 
+# Environment passed to child processes instead of the full parent
+# environment. PATH is kept so the same executables are found, HOME so
+# tshark still loads the user's plugins, and the C locale keeps command
+# output predictable for parsing.
+SUBPROCESS_ENV = {
+    "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+    "LANG": "C",
+    "LC_ALL": "C",
+}
+if "HOME" in os.environ:
+    SUBPROCESS_ENV["HOME"] = os.environ["HOME"]
+
 
 class WatchdogTimer(threading.Thread):
     """Class for creating a watchdog timer thread."""
@@ -28,7 +40,6 @@ class WatchdogTimer(threading.Thread):
         self._args = callback_args
         self._timer = timer
         self._disabled = threading.Event()
-        self._lock = threading.Lock()
         self._deadline = None
 
     def run(self):
@@ -39,11 +50,11 @@ class WatchdogTimer(threading.Thread):
         # occurs. If event is set, returns True, if timeout occurs, returns
         # False
         while not self._disabled.wait(timeout=time_remaining):
-            # Timeout occurred, but reset may have occurred
-            with self._lock:
-                if self._deadline <= self._timer():
-                    if self._callback is not None:
-                        return self._callback(*self._args)
+            # Timeout occurred, but reset may have occurred. reset() only
+            # stores a new deadline, so reading it needs no lock.
+            if self._deadline <= self._timer():
+                if self._callback is not None:
+                    return self._callback(*self._args)
         # If this is reached, watchdog timer was disabled
         return None
 
@@ -56,11 +67,6 @@ class WatchdogTimer(threading.Thread):
         """Disables the watchdog timer by setting a threading event."""
         self._disabled.set()
 
-    @property
-    def lock(self):
-        """Lock is public attribute."""
-        return self._lock
-
 
 def safe_remove_csv(file_name: str, logger: logging.Logger) -> True:
     """Permanently deletes the file at 'file_name'. Returns True if deleted,
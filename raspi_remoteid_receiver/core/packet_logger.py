@@ -10,8 +10,6 @@ import time
 import traceback
 import uuid
 
-import pyshark
-
 from raspi_remoteid_receiver.core import helpers, setup_logging
 
 
@@ -28,6 +26,7 @@ class PacketLoggerProcess(multiprocessing.Process):
             packet_timeout: int | float = 86400,
             sleep_timeout: int | float = 86400,
             interface_timeout: int | float = 60,
+            cpu_affinity: list[int] | None = None,
             **kwargs,
     ):
         super().__init__(**kwargs)
@@ -48,6 +47,7 @@ class PacketLoggerProcess(multiprocessing.Process):
         self.packet_timeout = packet_timeout
         self.sleep_timeout = sleep_timeout
         self.interface_timeout = interface_timeout
+        self.cpu_affinity = cpu_affinity
 
         self.interfaces = []
         self.cap = None
@@ -63,6 +63,24 @@ class PacketLoggerProcess(multiprocessing.Process):
         )
         setup_logging.logging_test(self.logger)
 
+    def set_cpu_affinity(self) -> None:
+        """Pins this process to the configured CPU cores so that packet
+        buffers stay in the same core's cache."""
+        if not self.cpu_affinity:
+            return
+        try:
+            os.sched_setaffinity(0, self.cpu_affinity)
+        except AttributeError:
+            self.logger.warning(
+                "Setting CPU affinity is not supported on this platform.",
+            )
+        except OSError as e:
+            self.logger.warning(
+                f"Failed to pin process to cores {self.cpu_affinity}: {e}",
+            )
+        else:
+            self.logger.info(f"Pinned process to cores {self.cpu_affinity}")
+
     def start_watchdog(self):
         """Creates a daemon thread which sends a SIGALRM signal to the
         calling process when the watchdog timer expires."""
@@ -120,6 +138,10 @@ class PacketLoggerProcess(multiprocessing.Process):
 
             raise RuntimeError(error_msg)
 
+        # Deferred import: pyshark is only needed inside the capture process,
+        # so the launcher doesn't pay for its import at startup
+        import pyshark
+
         # Setup live packet capture
         self.logger.info(
             f"Setting up live capture with interfaces: {self.interfaces}",
@@ -138,23 +160,21 @@ class PacketLoggerProcess(multiprocessing.Process):
         """Returns a summary string of RF information from a packet for
         debugging.
         """
-        try:
-            wlan_radio = pkt.wlan_radio
-        except AttributeError:
-            try:
-                nordic_ble = pkt.nordic_ble
-            except AttributeError:
+        wlan_radio = getattr(pkt, "wlan_radio", None)
+        if wlan_radio is not None:
+            proto_str = "Wi-Fi"
+            # Returns "Unknown" if wlan_radio.channel doesn't exist
+            ch = getattr(wlan_radio, "channel", "Unknown")
+            rss = getattr(wlan_radio, "signal_dbm", "Unknown")
+        else:
+            nordic_ble = getattr(pkt, "nordic_ble", None)
+            if nordic_ble is None:
                 # TODO: check Bluetooth 4 Legacy Advertising
                 return "Unknown Physical Layer Protocol"
             proto_str = "BLE"
             ch = getattr(nordic_ble, "channel", "Unknown")
             # TODO: make sure RSS and RSSI are the same or convert if not
             rss = getattr(nordic_ble, "rssi", "Unknown")
-        else:
-            proto_str = "Wi-Fi"
-            # Returns "Unknown" if wlan_radio.channel doesn't exist
-            ch = getattr(wlan_radio, "channel", "Unknown")
-            rss = getattr(wlan_radio, "signal_dbm", "Unknown")
 
         return f"{proto_str}, CH: {ch}, RSS: {rss} dBm"
 
@@ -162,19 +182,19 @@ class PacketLoggerProcess(multiprocessing.Process):
         """Tries to put a packet into the packet queue. If the queue is full,
         the packet gets dropped.
         """
-        with self.watchdog.lock:
-            if self.verbose_output:
-                self.logger.info(
-                    "Received Packet: %s",
-                    self.get_pkt_summary(pkt),
-                )
-            try:
-                self.packet_queue.put(pkt, block=False)
-            except queue.Full:
-                self.skipped_packets += 1
-            # Maybe put in finally block?
-            self.total_packets += 1
-            self.watchdog.reset()
+        if self.verbose_output:
+            self.logger.info(
+                "Received Packet: %s",
+                self.get_pkt_summary(pkt),
+            )
+        try:
+            self.packet_queue.put(pkt, block=False)
+        except queue.Full:
+            self.skipped_packets += 1
+        # Maybe put in finally block?
+        self.total_packets += 1
+        # Resetting is a single attribute store, so no lock is needed
+        self.watchdog.reset()
 
     def wait_for_packets(self):
         # Continuously put packets into the queue
@@ -196,6 +216,8 @@ class PacketLoggerProcess(multiprocessing.Process):
         )
 
     def manual_packet_capture(self):
+        import pyshark
+
         while True:
             file_name = str(uuid.uuid4()) + ".pcap"
             cmd = f"tshark -i 12 -Y 'opendroneid' -w '/tmp/{
@@ -207,6 +229,7 @@ class PacketLoggerProcess(multiprocessing.Process):
                     shell=True,
                     text=True,
                     stderr=subprocess.STDOUT,
+                    env=helpers.SUBPROCESS_ENV,
                 )
             except subprocess.CalledProcessError as exc:
                 self.logger.error(f"Error: {exc}")
@@ -235,6 +258,7 @@ class PacketLoggerProcess(multiprocessing.Process):
         self.setup_logger()
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGALRM, self.signal_handler)
+        self.set_cpu_affinity()
         try:
             self.setup_packet_logger()
             self.start_watchdog()
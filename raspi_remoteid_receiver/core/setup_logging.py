@@ -4,6 +4,45 @@ import multiprocessing
 from pathlib import Path
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """File handler which lets a large file buffer fill up instead of
+    flushing after every record. Records at or above flush_level are flushed
+    immediately so errors are on disk before a possible crash."""
+
+    def __init__(
+            self, filename: str, buffer_size: int = 128 * 1024,
+            flush_level: int = logging.WARNING, **kwargs,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        # Set while emitting a record below flush_level
+        self._skip_flush = False
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        return open(
+            self.baseFilename, self.mode, buffering=self.buffer_size,
+            encoding=self.encoding, errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # In append mode FileHandler.emit() reopens the file for records
+        # logged after close(), which would leak the handle during shutdown
+        if self._closed:
+            return
+        self._skip_flush = record.levelno < self.flush_level
+        try:
+            super().emit(record)
+        finally:
+            self._skip_flush = False
+
+    def flush(self) -> None:
+        # StreamHandler.emit() flushes after every record. Explicit calls,
+        # e.g. from close(), always flush.
+        if not self._skip_flush:
+            super().flush()
+
+
 def get_logging_formatter() -> logging.Formatter:
     # Format the log message
     # Log format: timestamp, logger name, log level, message
@@ -53,8 +92,9 @@ def setup_logging(
     # Create directory if it doesn't already exist
     path = Path(log_file)
     path.parent.mkdir(parents=True, exist_ok=True)
-    # Create file handler
-    file_handler = logging.FileHandler(log_file)
+    # Create file handler. Only the queue listener thread writes to the file,
+    # so records are buffered and written in large chunks.
+    file_handler = BufferedFileHandler(log_file)
     file_handler.setLevel(file_level)
     file_handler.setFormatter(formatter)
 
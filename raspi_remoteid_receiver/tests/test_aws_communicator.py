@@ -0,0 +1,91 @@
+import pathlib
+import queue
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import boto3.exceptions
+import botocore.exceptions
+
+import raspi_remoteid_receiver.core.aws_communicator as aws_module_under_test
+
+
+class UploadFileTestCase(unittest.TestCase):
+    """Tests method upload_file()"""
+
+    def setUp(self) -> None:
+        self.s3_client = mock.Mock()
+
+    def test_upload_file_s3_upload_failed(self):
+        """Verifying upload errors wrapped by S3Transfer return False"""
+        self.s3_client.upload_file.side_effect = \
+            boto3.exceptions.S3UploadFailedError("AccessDenied")
+        self.assertFalse(
+            aws_module_under_test.upload_file(
+                self.s3_client, "remote-id.csv", "bucket",
+            ),
+        )
+
+    def test_upload_file_connection_error(self):
+        """Verifying connection errors return False"""
+        self.s3_client.upload_file.side_effect = \
+            botocore.exceptions.EndpointConnectionError(
+                endpoint_url="https://s3.amazonaws.com",
+            )
+        self.assertFalse(
+            aws_module_under_test.upload_file(
+                self.s3_client, "remote-id.csv", "bucket",
+            ),
+        )
+
+
+class UploaderTestCase(unittest.TestCase):
+    """Tests methods uploader() and upload_failed()"""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_names = []
+        for i in range(2):
+            file_name = pathlib.Path(self.tmp_dir.name, f"remote-id-{i}.csv")
+            file_name.write_text("Source Address\r\n")
+            self.file_names.append(file_name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_uploader_counts_failed_uploads(self):
+        """Verifying failed uploads don't stop the uploader thread"""
+        s3_client = mock.Mock()
+        s3_client.upload_file.side_effect = \
+            boto3.exceptions.S3UploadFailedError("AccessDenied")
+        file_queue = queue.Queue()
+        for file_name in self.file_names:
+            file_queue.put(file_name)
+        csv_writer_exit_event = threading.Event()
+        csv_writer_exit_event.set()
+
+        with mock.patch.object(
+                aws_module_under_test, "create_s3_client",
+                return_value=s3_client,
+        ):
+            aws_module_under_test.uploader(
+                file_queue, "bucket", max_error_count=10,
+                csv_writer_exit_event=csv_writer_exit_event,
+                sigint_event=threading.Event(),
+                log_queue=queue.Queue(),
+            )
+
+        self.assertEqual(s3_client.upload_file.call_count, 2)
+        # Local copies are removed even if the upload failed
+        for file_name in self.file_names:
+            with self.subTest(msg=str(file_name)):
+                self.assertFalse(file_name.exists())
+
+    def test_upload_failed_unexpected_exception(self):
+        """Verifying an exception raised by an upload counts as a failure"""
+        future = mock.Mock()
+        future.result.side_effect = RuntimeError("worker crashed")
+        self.assertTrue(
+            aws_module_under_test.upload_failed(future, mock.Mock()),
+        )
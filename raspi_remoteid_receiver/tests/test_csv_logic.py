@@ -1,3 +1,6 @@
+import csv
+import io
+import time
 import unittest
 
 import raspi_remoteid_receiver.core.csv_creator as csv_module_under_test
@@ -170,5 +173,114 @@ class CreateRowTestCase(unittest.TestCase):
         # TODO:
 
 
+class CleanUniqueIdTestCase(unittest.TestCase):
+    """Tests method clean_unique_id()"""
+
+    def test_clean_unique_id_allowed(self):
+        """Verifying allowed characters are kept"""
+        unique_ids = [
+            "1581F5FJD22B0017G2D8",
+            "ABC-123_drone xyz",
+            "",
+        ]
+        for unique_id in unique_ids:
+            with self.subTest(msg=unique_id):
+                self.assertEqual(
+                    csv_module_under_test.clean_unique_id(unique_id),
+                    unique_id,
+                )
+
+    def test_clean_unique_id_removed(self):
+        """Verifying other characters are removed and whitespace stripped"""
+        unique_ids = {
+            "  ABC123  ": "ABC123",
+            "AB,C\"12;3\x00": "ABC123",
+            "ABC\t123\n": "ABC123",
+            "drône-ü": "drne-",
+            "ID 123\u00a0": "ID 123",
+        }
+        for unique_id, expected in unique_ids.items():
+            with self.subTest(msg=repr(unique_id)):
+                self.assertEqual(
+                    csv_module_under_test.clean_unique_id(unique_id),
+                    expected,
+                )
+
+
+class FormatRemoteIdTimestampTestCase(unittest.TestCase):
+    """Tests method CSVCreatorProcess._format_remoteid_ts()"""
+
+    def setUp(self) -> None:
+        self.csv_creator = csv_module_under_test.CSVCreatorProcess(
+            packet_queue=None, log_queue=None, upload_file_queue=None,
+            exit_event=None, sleep_event=None, sigint_event=None,
+        )
+
+    def test_format_remoteid_ts_matches_strftime(self):
+        """Verifying timestamps match time.strftime across hours and days"""
+        timestamps = [
+            0, 59, 3599, 3600, 1709923314, 1709923315, 1709927999,
+            1709928000, 1709942399, 1709942400,
+        ]
+        for utc_ts in timestamps:
+            for tenth in (0, 9):
+                with self.subTest(msg=f"{utc_ts}.{tenth}"):
+                    expected = time.strftime(
+                        '%Y-%m-%d %H:%M:%S', time.gmtime(utc_ts),
+                    ) + f".{tenth}"
+                    self.assertEqual(
+                        self.csv_creator._format_remoteid_ts(utc_ts, tenth),
+                        expected,
+                    )
+
+
+class FormatCSVRowTestCase(unittest.TestCase):
+    """Tests method format_csv_row()"""
+
+    @staticmethod
+    def csv_writer_line(row) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        return buffer.getvalue()
+
+    def test_format_csv_row_matches_csv_writer(self):
+        """Verifying rows are formatted the same as csv.writer"""
+        rows = [
+            csv_module_under_test.header_row,
+            [
+                "MAC-00:11:22:33:44:55", "ABC-123 drone",
+                "2024-03-08 18:41:54.5", "90", "1.25", "-0.5", "37.1234567",
+                "-121.7654321", 120.5, 1, 10, 4, -1000, 0, -1000.0, 0,
+            ],
+        ]
+        for row in rows:
+            with self.subTest(msg=row[0]):
+                self.assertEqual(
+                    csv_module_under_test.format_csv_row(row),
+                    self.csv_writer_line(row),
+                )
+
+    def test_format_csv_row_quoting(self):
+        """Verifying values which need quoting fall back to csv.writer"""
+        rows = [
+            ["a,b", "c"],
+            ['say "hi"', "c"],
+            ["line\nbreak", "c"],
+        ]
+        for row in rows:
+            with self.subTest(msg=row[0]):
+                self.assertEqual(
+                    csv_module_under_test.format_csv_row(row),
+                    self.csv_writer_line(row),
+                )
+
+    def test_header_line(self):
+        """Verifying the precomputed header line matches the header row"""
+        self.assertEqual(
+            csv_module_under_test.header_line,
+            self.csv_writer_line(csv_module_under_test.header_row),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()